@@ -0,0 +1,170 @@
+from datetime import date, datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '002'
+down_revision: Union[str, None] = '001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Months of empty partitions to create past the current month. The app keeps
+# topping this up at runtime (see app/utils/partitions.py).
+MONTHS_AHEAD = 3
+
+# Likes and comments are partitioned on their take's created_at so a take and
+# everything attached to it land in (and are archived from) the same month.
+PARTITION_KEYS = {
+    'takes': 'created_at',
+    'likes': 'take_created_at',
+    'comments': 'take_created_at',
+}
+
+
+def _add_months(month: date, n: int) -> date:
+    index = month.year * 12 + month.month - 1 + n
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _create_partitions(table: str, first: date, last: date) -> None:
+    month = first
+    while month <= last:
+        op.execute(
+            f"CREATE TABLE {table}_p{month:%Y_%m} PARTITION OF {table}_new "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_add_months(month, 1).isoformat()}')"
+        )
+        month = _add_months(month, 1)
+    op.execute(f"CREATE TABLE {table}_default PARTITION OF {table}_new DEFAULT")
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    oldest = bind.execute(sa.text("SELECT min(created_at) FROM takes")).scalar()
+    today = datetime.utcnow().date()
+    first = (oldest.date() if oldest else today).replace(day=1)
+    last = _add_months(today.replace(day=1), MONTHS_AHEAD)
+
+    op.execute("""
+        CREATE TABLE takes_new (
+            id UUID NOT NULL,
+            user_id UUID NOT NULL,
+            content TEXT NOT NULL,
+            like_count INTEGER NOT NULL,
+            created_at TIMESTAMP WITHOUT TIME ZONE DEFAULT now() NOT NULL,
+            toxicity_score FLOAT,
+            is_hidden BOOLEAN NOT NULL,
+            is_flagged BOOLEAN NOT NULL
+        ) PARTITION BY RANGE (created_at)
+    """)
+    op.execute("""
+        CREATE TABLE likes_new (
+            id UUID NOT NULL,
+            take_id UUID NOT NULL,
+            take_created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            user_id UUID NOT NULL,
+            created_at TIMESTAMP WITHOUT TIME ZONE DEFAULT now() NOT NULL
+        ) PARTITION BY RANGE (take_created_at)
+    """)
+    op.execute("""
+        CREATE TABLE comments_new (
+            id UUID NOT NULL,
+            take_id UUID NOT NULL,
+            take_created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            user_id UUID NOT NULL,
+            parent_id UUID,
+            content TEXT NOT NULL,
+            created_at TIMESTAMP WITHOUT TIME ZONE DEFAULT now() NOT NULL,
+            toxicity_score FLOAT,
+            is_hidden BOOLEAN NOT NULL,
+            is_flagged BOOLEAN NOT NULL
+        ) PARTITION BY RANGE (take_created_at)
+    """)
+    for table in PARTITION_KEYS:
+        _create_partitions(table, first, last)
+
+    # Copy existing rows across, then swap the new tables in
+    op.execute("INSERT INTO takes_new SELECT id, user_id, content, like_count, created_at, toxicity_score, is_hidden, is_flagged FROM takes")
+    op.execute("""
+        INSERT INTO likes_new (id, take_id, take_created_at, user_id, created_at)
+        SELECT l.id, l.take_id, t.created_at, l.user_id, l.created_at
+        FROM likes l JOIN takes t ON t.id = l.take_id
+    """)
+    op.execute("""
+        INSERT INTO comments_new (id, take_id, take_created_at, user_id, parent_id, content, created_at, toxicity_score, is_hidden, is_flagged)
+        SELECT c.id, c.take_id, t.created_at, c.user_id, c.parent_id, c.content, c.created_at, c.toxicity_score, c.is_hidden, c.is_flagged
+        FROM comments c JOIN takes t ON t.id = c.take_id
+    """)
+    op.drop_table('comments')
+    op.drop_table('likes')
+    op.drop_table('takes')
+    for table in PARTITION_KEYS:
+        op.rename_table(f'{table}_new', table)
+
+    # Primary and unique keys on a partitioned table must include the partition key
+    op.create_primary_key('takes_pkey', 'takes', ['id', 'created_at'])
+    op.create_foreign_key('takes_user_id_fkey', 'takes', 'users', ['user_id'], ['id'])
+    op.create_index('ix_takes_user_id', 'takes', ['user_id'])
+    op.create_index('ix_takes_created_at_desc', 'takes', [sa.text('created_at DESC')])
+
+    op.create_primary_key('likes_pkey', 'likes', ['id', 'take_created_at'])
+    op.create_foreign_key(
+        'likes_take_fkey', 'likes', 'takes',
+        ['take_id', 'take_created_at'], ['id', 'created_at'], ondelete='CASCADE',
+    )
+    op.create_foreign_key('likes_user_id_fkey', 'likes', 'users', ['user_id'], ['id'])
+    op.create_index('ix_likes_take_id', 'likes', ['take_id'])
+    # take_created_at is fixed per take, so this is still one like per (take, user)
+    op.create_unique_constraint('uq_likes_take_user', 'likes', ['take_id', 'take_created_at', 'user_id'])
+
+    # comments.parent_id no longer has a foreign key: comments.id alone is not
+    # unique across partitions, so it cannot be referenced.
+    op.create_primary_key('comments_pkey', 'comments', ['id', 'take_created_at'])
+    op.create_foreign_key(
+        'comments_take_fkey', 'comments', 'takes',
+        ['take_id', 'take_created_at'], ['id', 'created_at'], ondelete='CASCADE',
+    )
+    op.create_foreign_key('comments_user_id_fkey', 'comments', 'users', ['user_id'], ['id'])
+    op.create_index('ix_comments_take_id', 'comments', ['take_id'])
+    op.create_index('ix_comments_take_created', 'comments', ['take_id', sa.text('created_at DESC')])
+
+
+def downgrade() -> None:
+    for table in PARTITION_KEYS:
+        op.rename_table(table, f'{table}_partitioned')
+
+    # Copy out, then drop the partitioned tables (and their index names) before
+    # recreating keys and indexes on the plain tables
+    op.execute("""
+        CREATE TABLE takes AS
+        SELECT id, user_id, content, like_count, created_at, toxicity_score, is_hidden, is_flagged
+        FROM takes_partitioned
+    """)
+    op.execute("CREATE TABLE likes AS SELECT id, take_id, user_id, created_at FROM likes_partitioned")
+    op.execute("""
+        CREATE TABLE comments AS
+        SELECT id, take_id, user_id, parent_id, content, created_at, toxicity_score, is_hidden, is_flagged
+        FROM comments_partitioned
+    """)
+    op.execute("DROP TABLE comments_partitioned, likes_partitioned, takes_partitioned CASCADE")
+
+    op.create_primary_key('takes_pkey', 'takes', ['id'])
+    op.create_foreign_key('takes_user_id_fkey', 'takes', 'users', ['user_id'], ['id'])
+    op.execute("ALTER TABLE takes ALTER COLUMN created_at SET DEFAULT now()")
+    op.create_index('ix_takes_user_id', 'takes', ['user_id'])
+    op.create_index('ix_takes_created_at_desc', 'takes', [sa.text('created_at DESC')])
+
+    op.create_primary_key('likes_pkey', 'likes', ['id'])
+    op.create_foreign_key('likes_take_id_fkey', 'likes', 'takes', ['take_id'], ['id'], ondelete='CASCADE')
+    op.create_foreign_key('likes_user_id_fkey', 'likes', 'users', ['user_id'], ['id'])
+    op.execute("ALTER TABLE likes ALTER COLUMN created_at SET DEFAULT now()")
+    op.create_index('ix_likes_take_id', 'likes', ['take_id'])
+    op.create_unique_constraint('uq_likes_take_user', 'likes', ['take_id', 'user_id'])
+
+    op.create_primary_key('comments_pkey', 'comments', ['id'])
+    op.create_foreign_key('comments_take_id_fkey', 'comments', 'takes', ['take_id'], ['id'], ondelete='CASCADE')
+    op.create_foreign_key('comments_user_id_fkey', 'comments', 'users', ['user_id'], ['id'])
+    op.create_foreign_key('comments_parent_id_fkey', 'comments', 'comments', ['parent_id'], ['id'])
+    op.execute("ALTER TABLE comments ALTER COLUMN created_at SET DEFAULT now()")
+    op.create_index('ix_comments_take_id', 'comments', ['take_id'])
+    op.create_index('ix_comments_take_created', 'comments', ['take_id', sa.text('created_at DESC')])
@@ -0,0 +1,19 @@
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = '003'
+down_revision: Union[str, None] = '002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Feeds the username allocator (app/utils/username_generator.py), which maps
+# each value to a distinct name.
+
+
+def upgrade() -> None:
+    op.execute("CREATE SEQUENCE username_seq")
+
+
+def downgrade() -> None:
+    op.execute("DROP SEQUENCE username_seq")
@@ -0,0 +1,34 @@
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = '004'
+down_revision: Union[str, None] = '003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Full-text search over takes and comments: a generated tsvector column with a
+# GIN index, plus a trigram GIN index on content for fuzzy matching. Adding a
+# stored generated column rewrites each partition, so run this off-peak on
+# large tables. Partitions created later inherit both the column and indexes.
+
+SEARCH_TABLES = ('takes', 'comments')
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    for table in SEARCH_TABLES:
+        op.execute(
+            f"ALTER TABLE {table} ADD COLUMN search_vector tsvector "
+            f"GENERATED ALWAYS AS (to_tsvector('english', content)) STORED"
+        )
+        op.execute(f"CREATE INDEX ix_{table}_search_vector ON {table} USING gin (search_vector)")
+        op.execute(f"CREATE INDEX ix_{table}_content_trgm ON {table} USING gin (content gin_trgm_ops)")
+
+
+def downgrade() -> None:
+    for table in SEARCH_TABLES:
+        op.execute(f"DROP INDEX IF EXISTS ix_{table}_content_trgm")
+        op.execute(f"DROP INDEX IF EXISTS ix_{table}_search_vector")
+        op.execute(f"ALTER TABLE {table} DROP COLUMN search_vector")
@@ -0,0 +1,32 @@
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '005'
+down_revision: Union[str, None] = '004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Indexes for the /me activity pages: each page is a keyset walk over one
+# user's rows newest first, so (user_id, created_at DESC, id DESC) serves the
+# filter, order and tie-break without a sort. The takes one replaces the plain
+# user_id index, which it makes redundant.
+
+ACTIVITY_TABLES = ('takes', 'comments', 'likes')
+
+
+def upgrade() -> None:
+    for table in ACTIVITY_TABLES:
+        op.create_index(
+            f'ix_{table}_user_created',
+            table,
+            ['user_id', sa.text('created_at DESC'), sa.text('id DESC')],
+        )
+    op.drop_index('ix_takes_user_id', table_name='takes')
+
+
+def downgrade() -> None:
+    op.create_index('ix_takes_user_id', 'takes', ['user_id'])
+    for table in ACTIVITY_TABLES:
+        op.drop_index(f'ix_{table}_user_created', table_name=table)
@@ -0,0 +1,55 @@
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '007'
+down_revision: Union[str, None] = '006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Deduplicated reports and per-target report counters. Each reporter (a user,
+# or an IP for anonymous reports) counts once per target; existing rows get
+# their signed-in reporter's key once and a unique legacy key otherwise, and
+# the counters start from the reports already filed.
+
+
+def upgrade() -> None:
+    for table in ('takes', 'comments'):
+        op.add_column(table, sa.Column('report_count', sa.Integer(), server_default='0', nullable=False))
+
+    op.add_column('reports', sa.Column('reporter_key', sa.Text(), nullable=True))
+    op.execute("""
+        UPDATE reports SET reporter_key = CASE
+            WHEN reporter_user_id IS NOT NULL AND ranked.n = 1 THEN 'user:' || reporter_user_id
+            ELSE 'legacy:' || reports.id
+        END
+        FROM (
+            SELECT id, row_number() OVER (
+                PARTITION BY target_type, target_id, reporter_user_id ORDER BY created_at
+            ) AS n
+            FROM reports
+        ) AS ranked
+        WHERE ranked.id = reports.id
+    """)
+    op.alter_column('reports', 'reporter_key', nullable=False)
+    op.create_unique_constraint(
+        'uq_reports_target_reporter', 'reports', ['target_type', 'target_id', 'reporter_key'],
+    )
+
+    for table, target_type in (('takes', 'take'), ('comments', 'comment')):
+        op.execute(f"""
+            UPDATE {table} SET report_count = counts.n
+            FROM (
+                SELECT target_id, count(*) AS n FROM reports
+                WHERE target_type = '{target_type}' GROUP BY target_id
+            ) AS counts
+            WHERE {table}.id = counts.target_id
+        """)
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_reports_target_reporter', 'reports', type_='unique')
+    op.drop_column('reports', 'reporter_key')
+    for table in ('takes', 'comments'):
+        op.drop_column(table, 'report_count')
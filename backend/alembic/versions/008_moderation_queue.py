@@ -0,0 +1,38 @@
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '008'
+down_revision: Union[str, None] = '007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Partial indexes for the moderation queue. Only flagged rows are indexed, so
+# they stay small however large takes and comments grow, and each queue order
+# (most reported, most toxic; newest first on ties) is an index walk from the
+# keyset cursor. The expression has to match the one the queue orders by.
+
+MODERATION_TABLES = ('takes', 'comments')
+
+
+def upgrade() -> None:
+    for table in MODERATION_TABLES:
+        op.create_index(
+            f'ix_{table}_flagged_reports',
+            table,
+            [sa.text('report_count DESC'), sa.text('created_at DESC'), sa.text('id DESC')],
+            postgresql_where=sa.text('is_flagged'),
+        )
+        op.create_index(
+            f'ix_{table}_flagged_toxicity',
+            table,
+            [sa.text('coalesce(toxicity_score, 0) DESC'), sa.text('created_at DESC'), sa.text('id DESC')],
+            postgresql_where=sa.text('is_flagged'),
+        )
+
+
+def downgrade() -> None:
+    for table in MODERATION_TABLES:
+        op.drop_index(f'ix_{table}_flagged_toxicity', table_name=table)
+        op.drop_index(f'ix_{table}_flagged_reports', table_name=table)
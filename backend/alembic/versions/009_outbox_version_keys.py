@@ -0,0 +1,31 @@
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = '009'
+down_revision: Union[str, None] = '008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# ETag version bumps go through the transactional outbox too. A write's bumps
+# are stored as one row with the Redis keys to INCR and no channel or payload,
+# so the relay retries them with the events instead of a lost bump leaving
+# stale responses answered with 304 until the next write.
+
+
+def upgrade() -> None:
+    op.add_column(
+        'event_outbox',
+        sa.Column('version_keys', postgresql.ARRAY(sa.Text()), server_default='{}', nullable=False),
+    )
+    op.alter_column('event_outbox', 'channel', nullable=True)
+    op.alter_column('event_outbox', 'payload', nullable=True)
+
+
+def downgrade() -> None:
+    op.execute("DELETE FROM event_outbox WHERE channel IS NULL")
+    op.alter_column('event_outbox', 'payload', nullable=False)
+    op.alter_column('event_outbox', 'channel', nullable=False)
+    op.drop_column('event_outbox', 'version_keys')
@@ -12,10 +12,123 @@ class Settings(BaseSettings):
     google_client_id: str = ""
     google_client_secret: str = ""
     google_redirect_uri: str = "http://localhost:8000/auth/google/callback"
+    # Endpoints are configurable so logins can run against a local mock server
+    google_auth_url: str = "https://accounts.google.com/o/oauth2/v2/auth"
+    google_token_url: str = "https://oauth2.googleapis.com/token"
+    google_userinfo_url: str = "https://www.googleapis.com/oauth2/v2/userinfo"
+    google_jwks_url: str = "https://www.googleapis.com/oauth2/v3/certs"
+    google_issuer: str = "https://accounts.google.com"
+    # Identify users from the verified id_token instead of calling userinfo
+    google_verify_id_token: bool = True
+
+    # Shared outbound HTTP client
+    http_timeout_seconds: float = 10.0
+    http_connect_timeout_seconds: float = 3.0
+    http_retries: int = 2
 
     # Frontend URL (for redirecting after OAuth)
     frontend_url: str = "http://localhost:3000"
 
+    # Usernames are Adjective + Noun + 1..username_max_number. Changing this
+    # reshuffles which names new users get; existing names are unaffected.
+    username_max_number: int = 9999
+
+    # Monthly partitions to keep created ahead of the current month
+    partition_months_ahead: int = 3
+
+    # How often the top-today leaderboard is recomputed
+    leaderboard_refresh_seconds: int = 5
+
+    # In-process take cache (0 disables). Entries are kept up to date by pub/sub
+    # events; the TTL bounds staleness if an event is missed.
+    take_cache_size: int = 10000
+    take_cache_ttl_seconds: float = 30.0
+
+    # Distinct reports after which a take or comment is flagged for the
+    # moderation queue, and after which it is hidden (0 turns either off)
+    report_flag_threshold: int = 3
+    report_hide_threshold: int = 10
+
+    # Bearer token required to scrape /metrics. Without one, /metrics is only
+    # served in debug mode.
+    metrics_token: str = ""
+
+    # Bearer token for /admin endpoints (admin endpoints are disabled if empty)
+    admin_token: str = ""
+
+    # Stack-sampling profiler. Hooks are only installed when enabled; targets
+    # and sample rates can then be changed at runtime through /admin/profiling.
+    profiling_enabled: bool = False
+    profile_targets: str = ""  # comma-separated, e.g. "get_takes,like_take"
+    profile_sample_rate: float = 0.01
+    profile_interval_ms: float = 5.0
+
+    # HTTP response compression (smaller bodies go out uncompressed)
+    compression_minimum_size: int = 1024
+    gzip_level: int = 6
+    brotli_quality: int = 4
+
+    # WebSocket permessage-deflate, negotiated when served through app.server.
+    # Context takeover compresses better but keeps a zlib window per socket.
+    ws_compression: bool = True
+    ws_compression_level: int = 6
+    ws_context_takeover: bool = True
+
+    # Worker processes started by app.server. Database and Redis pools are
+    # per worker, so the connections needed grow with this.
+    web_concurrency: int = 1
+    # Where workers share metrics so /metrics covers all of them (app.server
+    # sets a temporary one in multi-worker mode)
+    metrics_dir: str = ""
+
+    # Startup/shutdown: Redis connections opened before serving, and how long
+    # open WebSockets are given to close on shutdown (keep under the
+    # platform's kill timeout)
+    redis_warm_connections: int = 5
+    ws_drain_seconds: float = 3.0
+
+    # Also store pub/sub events and ETag version bumps in event_outbox within
+    # the write's transaction and send them from a relay worker, so none are
+    # lost between commit and publish (adds up to one relay interval of latency)
+    transactional_outbox: bool = False
+    outbox_relay_interval_seconds: float = 0.2
+    outbox_relay_batch_size: int = 500
+
+    # Redis connection pool shared by the process. Requests wait up to
+    # redis_pool_timeout for a free connection; connections idle longer than
+    # the health check interval are pinged before reuse.
+    redis_max_connections: int = 50
+    redis_pool_timeout: float = 5.0
+    redis_health_check_interval: int = 30
+    redis_connect_timeout: float = 3.0
+    # Per-command socket timeout (subscriptions are exempt)
+    redis_socket_timeout: float = 5.0
+    # Unix socket of a Redis on the same host; REDIS_URL then only supplies
+    # the password and db
+    redis_socket_path: str = ""
+    # TCP keepalive probes (ignored for Unix sockets)
+    redis_keepalive_idle: int = 60
+    redis_keepalive_interval: int = 10
+    redis_keepalive_count: int = 3
+
+    # Postgres connections. database_socket_dir connects through the Unix
+    # socket in that directory (Postgres or PgBouncer on the same host)
+    # instead of the URL's host; the URL's port still picks the socket file.
+    database_socket_dir: str = ""
+    database_connect_timeout: float = 5.0
+    database_command_timeout: float | None = None
+    # Replace pooled connections older than this (-1 keeps them forever)
+    database_pool_recycle_seconds: int = -1
+    # Server-side TCP keepalive for our connections (0 keeps the server's
+    # default). Sent as startup parameters, so not used with PgBouncer.
+    database_keepalive_idle: int = 0
+    database_keepalive_interval: int = 0
+    database_keepalive_count: int = 0
+    # Set when DATABASE_URL points at PgBouncer in transaction mode: turns
+    # off prepared statement caching, which can't survive a transaction being
+    # moved to another server connection
+    database_pgbouncer: bool = False
+
     class Config:
         env_file = ".env"
 
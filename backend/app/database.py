@@ -1,16 +1,56 @@
+import asyncio
+from uuid import uuid4
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
-from app.config import get_settings
+from app.config import Settings, get_settings
+from app.utils.metrics import TimedPool, instrument_engine
+from app.utils.outbox import discard_outbox, flush_outbox, write_outbox
 
 # This file sets up an async PostgreSQL connection and provides a database 
 # session per request for FastAPI
 
 settings = get_settings()
 
+# create_async_engine arguments for the socket, timeout, keepalive and
+# PgBouncer settings
+def engine_options(settings: Settings) -> dict:
+    connect_args = {
+        "timeout": settings.database_connect_timeout,
+        "command_timeout": settings.database_command_timeout,
+    }
+    if settings.database_socket_dir:
+        connect_args["host"] = settings.database_socket_dir
+
+    if settings.database_pgbouncer:
+        # Transaction pooling runs each transaction on whichever server
+        # connection is free, so statements can't be prepared once and reused;
+        # unique names keep the one-off ones from colliding
+        connect_args["statement_cache_size"] = 0
+        connect_args["prepared_statement_cache_size"] = 0
+        connect_args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid4()}__"
+    else:
+        keepalives = {
+            "tcp_keepalives_idle": settings.database_keepalive_idle,
+            "tcp_keepalives_interval": settings.database_keepalive_interval,
+            "tcp_keepalives_count": settings.database_keepalive_count,
+        }
+        server_settings = {name: str(value) for name, value in keepalives.items() if value}
+        if server_settings:
+            connect_args["server_settings"] = server_settings
+
+    return {
+        "connect_args": connect_args,
+        "pool_recycle": settings.database_pool_recycle_seconds,
+    }
+
 engine = create_async_engine(
     settings.database_url,
     echo=settings.debug,
+    poolclass=TimedPool,
+    **engine_options(settings),
 )
+instrument_engine(engine.sync_engine)
 
 async_session_maker = async_sessionmaker(
     engine,
@@ -25,7 +65,23 @@ async def get_db() -> AsyncSession:
     async with async_session_maker() as session:
         try:
             yield session
+            await write_outbox(session)
             await session.commit()
         except Exception:
             await session.rollback()
+            discard_outbox(session)
             raise
+
+        # The connection went back to the pool with the commit; events queued
+        # by the handler are only published now that the write is durable
+        await flush_outbox(session)
+
+
+# Fill the connection pool up front so the first requests after a start don't
+# pay for connection setup
+async def warm_pool():
+    async def check_out():
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    await asyncio.gather(*(check_out() for _ in range(engine.pool.size())))
@@ -1,7 +1,10 @@
-from fastapi import Depends, HTTPException, Cookie
+from uuid import UUID
+
+from fastapi import Depends, HTTPException, Cookie, Header
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
+from app.config import get_settings
 from app.database import get_db
 from app.models import User
 from app.utils.jwt import verify_session_token
@@ -38,4 +41,36 @@ async def get_optional_user(
         return None
 
     result = await db.execute(select(User).where(User.id == user_id))
-    return result.scalar_one_or_none()
\ No newline at end of file
+    return result.scalar_one_or_none()
+
+# Viewer id straight from the session token, without loading the user. Read
+# endpoints only need the id (for user_liked), so this saves a round trip.
+async def get_optional_user_id(
+    session: str | None = Cookie(None),
+) -> UUID | None:
+    if not session:
+        return None
+
+    return verify_session_token(session)
+
+# Like get_current_user, but only verifies the session token. For endpoints
+# that just need the id, this skips loading the user row.
+async def get_current_user_id(
+    session: str | None = Cookie(None),
+) -> UUID:
+    if not session:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+
+    user_id = verify_session_token(session)
+    if not user_id:
+        raise HTTPException(status_code=401, detail="Invalid or expired session")
+
+    return user_id
+
+# Guard for operator-only endpoints: requires `Authorization: Bearer <admin_token>`
+async def require_admin(
+    authorization: str | None = Header(None),
+) -> None:
+    settings = get_settings()
+    if not settings.admin_token or authorization != f"Bearer {settings.admin_token}":
+        raise HTTPException(status_code=403, detail="Not authorized")
@@ -1,14 +1,79 @@
-from fastapi import FastAPI
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
 from app.config import get_settings
-from app.routers import auth, takes, websocket, reports
+from app.database import engine, warm_pool
+from app.routers import auth, takes, me, websocket, reports, admin, moderation
+from app.utils.partitions import maintain_partitions
+from app.utils.leaderboard import run_leaderboard_refresher
+from app.utils.outbox import run_outbox_relay
+from app.utils.metrics import MetricsMiddleware, dump_metrics, render_metrics
+from app.utils.compression import CompressionMiddleware
+from app.utils.profanity import load_profanity
+from app.utils.redis_client import close_redis, warm_redis
+from app.utils.http_client import close_http_client
+from app.utils.websocket_manager import comments_manager, drain_websockets, feed_manager
+
+logger = logging.getLogger(__name__)
 
 settings = get_settings()
 
+# How often a worker publishes its metrics to the other workers
+METRICS_DUMP_SECONDS = 5
+
+async def dump_metrics_periodically(directory: str):
+    while True:
+        await asyncio.sleep(METRICS_DUMP_SECONDS)
+        try:
+            dump_metrics(directory)
+        except OSError:
+            logger.warning("Could not write metrics to %s", directory, exc_info=True)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm the DB and Redis pools and build the profanity word list before
+    # taking traffic, so the first requests after a deploy aren't slow
+    try:
+        await asyncio.gather(
+            warm_pool(),
+            warm_redis(settings.redis_warm_connections),
+            asyncio.to_thread(load_profanity),
+        )
+    except Exception:
+        logger.exception("Warm-up failed, continuing with cold pools")
+
+    feed_manager.start()
+    comments_manager.start()
+    # Keep next months' partitions created so inserts never hit the default partition
+    partition_task = asyncio.create_task(maintain_partitions())
+    leaderboard_task = asyncio.create_task(run_leaderboard_refresher())
+    tasks = [partition_task, leaderboard_task]
+    if settings.transactional_outbox:
+        tasks.append(asyncio.create_task(run_outbox_relay(engine)))
+    if settings.metrics_dir:
+        tasks.append(asyncio.create_task(dump_metrics_periodically(settings.metrics_dir)))
+    yield
+
+    # No-op if app.server already drained before uvicorn closed the sockets
+    await drain_websockets(settings.ws_drain_seconds)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await close_http_client()
+    await close_redis()
+    await engine.dispose()
+    if settings.metrics_dir:
+        dump_metrics(settings.metrics_dir)
+
 app = FastAPI(
     title="Hot Takes API",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -24,11 +89,33 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.compression_minimum_size,
+    gzip_level=settings.gzip_level,
+    brotli_quality=settings.brotli_quality,
+)
+
+app.add_middleware(MetricsMiddleware)
+
 app.include_router(auth.router)
 app.include_router(takes.router)
+app.include_router(me.router)
 app.include_router(websocket.router)
 app.include_router(reports.router)
+app.include_router(admin.router)
+app.include_router(moderation.router)
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
\ No newline at end of file
+    return {"status": "healthy"}
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics(request: Request):
+    # Closed unless a token is set, except in debug
+    if not settings.metrics_token:
+        if not settings.debug:
+            raise HTTPException(status_code=404, detail="Not Found")
+    elif request.headers.get("Authorization") != f"Bearer {settings.metrics_token}":
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    return PlainTextResponse(render_metrics(settings.metrics_dir), media_type="text/plain; version=0.0.4")
@@ -1,27 +1,53 @@
 import uuid
-from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy import Column, Text, Float, Boolean, DateTime, ForeignKey, Index, func
-from sqlalchemy.orm import relationship
+from sqlalchemy.dialects.postgresql import TSVECTOR, UUID
+from sqlalchemy import Column, Text, Float, Boolean, Integer, DateTime, ForeignKey, ForeignKeyConstraint, Computed, Index, func, literal_column
+from sqlalchemy.orm import deferred, relationship
 from app.database import Base
 
 
+# Partitioned on the parent take's created_at, like likes
 class Comment(Base):
     __tablename__ = "comments"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    take_id = Column(UUID(as_uuid=True), ForeignKey("takes.id", ondelete="CASCADE"), nullable=False, index=True)
+    take_id = Column(UUID(as_uuid=True), nullable=False, index=True)
+    take_created_at = Column(DateTime, nullable=False)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
-    parent_id = Column(UUID(as_uuid=True), ForeignKey("comments.id"), nullable=True)
+    # No database foreign key: comments.id is only unique per partition
+    parent_id = Column(UUID(as_uuid=True), nullable=True)
     content = Column(Text, nullable=False)
     created_at = Column(DateTime, server_default=func.now(), nullable=False)
     toxicity_score = Column(Float, nullable=True)
     is_hidden = Column(Boolean, default=False, nullable=False)
     is_flagged = Column(Boolean, default=False, nullable=False)
+    report_count = Column(Integer, default=0, server_default="0", nullable=False)
+    # Generated by Postgres for full-text search; deferred so ORM loads skip it
+    search_vector = deferred(Column(TSVECTOR, Computed("to_tsvector('english', content)", persisted=True)))
 
     take = relationship("Take", back_populates="comments")
     user = relationship("User", back_populates="comments")
-    parent = relationship("Comment", remote_side=[id], backref="replies")
+    parent = relationship(
+        "Comment",
+        primaryjoin="foreign(Comment.parent_id) == remote(Comment.id)",
+        backref="replies",
+    )
 
     __table_args__ = (
+        ForeignKeyConstraint(
+            [take_id, take_created_at],
+            ["takes.id", "takes.created_at"],
+            ondelete="CASCADE",
+            name="comments_take_fkey",
+        ),
         Index("ix_comments_take_created", take_id, created_at.desc()),
+        Index("ix_comments_user_created", user_id, created_at.desc(), id.desc()),
+        Index("ix_comments_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_comments_content_trgm", "content", postgresql_using="gin", postgresql_ops={"content": "gin_trgm_ops"}),
+        Index("ix_comments_flagged_reports", report_count.desc(), created_at.desc(), id.desc(), postgresql_where=is_flagged),
+        Index(
+            "ix_comments_flagged_toxicity",
+            func.coalesce(toxicity_score, literal_column("0")).desc(), created_at.desc(), id.desc(),
+            postgresql_where=is_flagged,
+        ),
+        {"postgresql_partition_by": "RANGE (take_created_at)"},
     )
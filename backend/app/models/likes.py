@@ -1,15 +1,18 @@
 import uuid
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy import Column, DateTime, ForeignKey, UniqueConstraint, func
+from sqlalchemy import Column, DateTime, ForeignKey, ForeignKeyConstraint, Index, UniqueConstraint, func
 from sqlalchemy.orm import relationship
 from app.database import Base
 
 
+# Partitioned on the liked take's created_at, so a take's likes live in the
+# same month as the take and (take_id, user_id) stays unique.
 class Like(Base):
     __tablename__ = "likes"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    take_id = Column(UUID(as_uuid=True), ForeignKey("takes.id", ondelete="CASCADE"), nullable=False, index=True)
+    take_id = Column(UUID(as_uuid=True), nullable=False, index=True)
+    take_created_at = Column(DateTime, nullable=False)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     created_at = Column(DateTime, server_default=func.now(), nullable=False)
 
@@ -17,5 +20,13 @@ class Like(Base):
     user = relationship("User", back_populates="likes")
 
     __table_args__ = (
-        UniqueConstraint("take_id", "user_id", name="uq_likes_take_user"),
+        ForeignKeyConstraint(
+            [take_id, take_created_at],
+            ["takes.id", "takes.created_at"],
+            ondelete="CASCADE",
+            name="likes_take_fkey",
+        ),
+        UniqueConstraint("take_id", "take_created_at", "user_id", name="uq_likes_take_user"),
+        Index("ix_likes_user_created", user_id, created_at.desc(), id.desc()),
+        {"postgresql_partition_by": "RANGE (take_created_at)"},
     )
@@ -1,6 +1,6 @@
 import uuid
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy import Column, String, Text, DateTime, ForeignKey, func
+from sqlalchemy import Column, String, Text, DateTime, ForeignKey, UniqueConstraint, func
 from app.database import Base
 
 
@@ -12,4 +12,11 @@ class Report(Base):
     target_id = Column(UUID(as_uuid=True), nullable=False)
     reason = Column(Text, nullable=False)
     reporter_user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=True)
+    # Who reported: "user:<id>" when signed in, else "ip:<address>". Each
+    # reporter counts once per target.
+    reporter_key = Column(Text, nullable=False)
     created_at = Column(DateTime, server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("target_type", "target_id", "reporter_key", name="uq_reports_target_reporter"),
+    )
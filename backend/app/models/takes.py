@@ -1,20 +1,26 @@
 import uuid
-from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy import Column, Text, Integer, Float, Boolean, DateTime, ForeignKey, Index, func
-from sqlalchemy.orm import relationship
+from sqlalchemy.dialects.postgresql import TSVECTOR, UUID
+from sqlalchemy import Column, Text, Integer, Float, Boolean, DateTime, ForeignKey, Computed, Index, func, literal_column
+from sqlalchemy.orm import deferred, relationship
 from app.database import Base
 
+# Range-partitioned by month on created_at (see app/utils/partitions.py). The
+# database primary key is (id, created_at); the ORM only needs id.
 class Take(Base):
     __tablename__ = "takes"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     content = Column(Text, nullable=False)
     like_count = Column(Integer, default=0, nullable=False)
     created_at = Column(DateTime, server_default=func.now(), nullable=False)
     toxicity_score = Column(Float, nullable=True)
     is_hidden = Column(Boolean, default=False, nullable=False)
     is_flagged = Column(Boolean, default=False, nullable=False)
+    # Distinct reporters; crossing the report thresholds flags, then hides
+    report_count = Column(Integer, default=0, server_default="0", nullable=False)
+    # Generated by Postgres for full-text search; deferred so ORM loads skip it
+    search_vector = deferred(Column(TSVECTOR, Computed("to_tsvector('english', content)", persisted=True)))
 
     user = relationship("User", back_populates="takes")
     comments = relationship("Comment", back_populates="take", cascade="all, delete-orphan")
@@ -22,4 +28,15 @@ class Take(Base):
 
     __table_args__ = (
         Index("ix_takes_created_at_desc", created_at.desc()),
+        Index("ix_takes_user_created", user_id, created_at.desc(), id.desc()),
+        Index("ix_takes_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_takes_content_trgm", "content", postgresql_using="gin", postgresql_ops={"content": "gin_trgm_ops"}),
+        # Moderation queue orders; partial, so they only hold flagged rows
+        Index("ix_takes_flagged_reports", report_count.desc(), created_at.desc(), id.desc(), postgresql_where=is_flagged),
+        Index(
+            "ix_takes_flagged_toxicity",
+            func.coalesce(toxicity_score, literal_column("0")).desc(), created_at.desc(), id.desc(),
+            postgresql_where=is_flagged,
+        ),
+        {"postgresql_partition_by": "RANGE (created_at)"},
     )
\ No newline at end of file
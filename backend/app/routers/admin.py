@@ -0,0 +1,53 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import PlainTextResponse
+
+from app.config import get_settings
+from app.dependencies import require_admin
+from app.schemas.schemas import ProfilingUpdate, ProfilingStatus
+from app.utils.profiling import TARGETS, sampler
+
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(require_admin)])
+
+def profiling_status() -> ProfilingStatus:
+    return ProfilingStatus(
+        enabled=get_settings().profiling_enabled,
+        targets=sorted(TARGETS),
+        sample_rates=dict(sampler.sample_rates),
+        samples=sampler.sample_counts(),
+    )
+
+@router.get("/profiling", response_model=ProfilingStatus)
+async def get_profiling():
+    return profiling_status()
+
+# Set the sample rate for a target (0 turns it off)
+@router.post("/profiling", response_model=ProfilingStatus)
+async def update_profiling(request: ProfilingUpdate):
+    if not get_settings().profiling_enabled:
+        raise HTTPException(status_code=409, detail="Profiling hooks are not installed (set PROFILING_ENABLED)")
+
+    if request.target not in TARGETS:
+        raise HTTPException(status_code=404, detail="Unknown profiling target")
+
+    if request.sample_rate:
+        sampler.sample_rates[request.target] = request.sample_rate
+    else:
+        sampler.sample_rates.pop(request.target, None)
+
+    return profiling_status()
+
+# Collapsed stacks for a target, ready for flamegraph.pl or speedscope
+@router.get("/profiling/{target}/flamegraph", response_class=PlainTextResponse)
+async def get_flamegraph(target: str):
+    if target not in TARGETS:
+        raise HTTPException(status_code=404, detail="Unknown profiling target")
+
+    return PlainTextResponse(sampler.collapsed(target))
+
+@router.delete("/profiling/{target}", response_model=ProfilingStatus)
+async def reset_profiling(target: str):
+    if target not in TARGETS:
+        raise HTTPException(status_code=404, detail="Unknown profiling target")
+
+    sampler.reset(target)
+    return profiling_status()
@@ -4,7 +4,6 @@ from fastapi import APIRouter, Depends, HTTPException, Response, Request
 from fastapi.responses import RedirectResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-import httpx
 
 from app.database import get_db
 from app.models import User
@@ -12,23 +11,20 @@ from app.schemas.schemas import RegisterRequest, LoginRequest, AuthResponse, Use
 from app.utils.password import hash_password, verify_password
 from app.utils.jwt import create_session_token
 from app.utils.jwt import verify_session_token
-from app.utils.username_generator import generate_username
+from app.utils.username_generator import create_user
 from app.dependencies import get_current_user
 from app.config import get_settings
 from app.utils.rate_limit import check_rate_limit, get_client_ip
+from app.utils.google_oauth import get_google_user
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
-settings = get_settings()
 COOKIE_NAME = "session"
-# Use secure cookies only in production (not localhost)
-COOKIE_SECURE = not settings.debug
-COOKIE_SAMESITE = "lax" if settings.debug else "none"
 
-# Google OAuth endpoints (public, same for everyone)
-GOOGLE_AUTH_URL = "https://accounts.google.com/o/oauth2/v2/auth"
-GOOGLE_TOKEN_URL = "https://oauth2.googleapis.com/token"
-GOOGLE_USERINFO_URL = "https://www.googleapis.com/oauth2/v2/userinfo"
+# Use secure cookies only in production (not localhost)
+def cookie_options() -> dict:
+    debug = get_settings().debug
+    return {"secure": not debug, "samesite": "lax" if debug else "none"}
 
 @router.post("/register", response_model=AuthResponse)
 async def register(
@@ -51,24 +47,12 @@ async def register(
     if result.scalar_one_or_none():
         raise HTTPException(status_code=400, detail="Email already registered")
 
-    # Generate unique username (retry if collision)
-    for _ in range(5):
-        username = generate_username()
-        result = await db.execute(select(User).where(User.username == username))
-        if not result.scalar_one_or_none():
-            break
-    else:
-        raise HTTPException(status_code=500, detail="Could not generate unique username")
-
-    # Create user
-    user = User(
+    # Create user with a freshly allocated username
+    user = await create_user(
+        db,
         email=request.email,
-        username=username,
         password_hash=hash_password(request.password),
     )
-    db.add(user)
-    await db.flush()
-    await db.refresh(user)
 
     # Set session cookie
     token = create_session_token(user.id)
@@ -76,8 +60,7 @@ async def register(
         key=COOKIE_NAME,
         value=token,
         httponly=True,
-        secure=COOKIE_SECURE,
-        samesite=COOKIE_SAMESITE,
+        **cookie_options(),
         max_age=60 * 60 * 24 * 7,  # 7 days
         path="/",
     )
@@ -122,8 +105,7 @@ async def login(
         key=COOKIE_NAME,
         value=token,
         httponly=True,
-        secure=COOKIE_SECURE,
-        samesite=COOKIE_SAMESITE,
+        **cookie_options(),
         max_age=60 * 60 * 24 * 7,  # 7 days
         path="/",
     )
@@ -137,8 +119,7 @@ async def login(
 async def logout(response: Response):
     response.delete_cookie(
         key=COOKIE_NAME,
-        secure=COOKIE_SECURE,
-        samesite=COOKIE_SAMESITE,
+        **cookie_options(),
         path="/",
     )
     return {"message": "Logged out"}
@@ -178,8 +159,7 @@ async def exchange_token(
         key=COOKIE_NAME,
         value=token,
         httponly=True,
-        secure=COOKIE_SECURE,
-        samesite=COOKIE_SAMESITE,
+        **cookie_options(),
         max_age=60 * 60 * 24 * 7,  # 7 days
         path="/",
     )
@@ -200,7 +180,7 @@ async def google_login():
         "scope": "openid email profile",
         "access_type": "offline",
     }
-    url = f"{GOOGLE_AUTH_URL}?{urlencode(params)}"
+    url = f"{settings.google_auth_url}?{urlencode(params)}"
     return RedirectResponse(url=url)
 
 @router.get("/google/callback")
@@ -212,41 +192,7 @@ async def google_callback(
 
     settings = get_settings()
 
-    # Exchange code for tokens
-    async with httpx.AsyncClient() as client:
-        token_response = await client.post(
-            GOOGLE_TOKEN_URL,
-            data={
-                "client_id": settings.google_client_id,
-                "client_secret": settings.google_client_secret,
-                "code": code,
-                "grant_type": "authorization_code",
-                "redirect_uri": settings.google_redirect_uri,
-            },
-        )
-
-    if token_response.status_code != 200:
-        raise HTTPException(status_code=400, detail="Failed to exchange code for token")
-
-    tokens = token_response.json()
-    access_token = tokens.get("access_token")
-
-    # Get user info from Google
-    async with httpx.AsyncClient() as client:
-        userinfo_response = await client.get(
-            GOOGLE_USERINFO_URL,
-            headers={"Authorization": f"Bearer {access_token}"},
-        )
-
-    if userinfo_response.status_code != 200:
-        raise HTTPException(status_code=400, detail="Failed to get user info from Google")
-
-    google_user = userinfo_response.json()
-    google_id = google_user.get("id")
-    email = google_user.get("email")
-
-    if not google_id or not email:
-        raise HTTPException(status_code=400, detail="Invalid user info from Google")
+    google_id, email = await get_google_user(code)
 
     # Find or create user
     result = await db.execute(select(User).where(User.google_id == google_id))
@@ -261,25 +207,10 @@ async def google_callback(
             # Link Google account to existing user
             existing_user.google_id = google_id
             user = existing_user
+            await db.flush()
         else:
             # Create new user
-            for _ in range(5):
-                username = generate_username()
-                result = await db.execute(select(User).where(User.username == username))
-                if not result.scalar_one_or_none():
-                    break
-            else:
-                raise HTTPException(status_code=500, detail="Could not generate unique username")
-
-            user = User(
-                email=email,
-                username=username,
-                google_id=google_id,
-            )
-            db.add(user)
-
-        await db.flush()
-        await db.refresh(user)
+            user = await create_user(db, email=email, google_id=google_id)
 
     # Create session and redirect to frontend with token in URL
     token = create_session_token(user.id)
@@ -0,0 +1,117 @@
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+
+from app.database import get_db
+from app.models import User, Take, Like, Comment
+from app.schemas.schemas import TakesListResponse, CommentsPageResponse
+from app.dependencies import get_current_user_id
+from app.utils.feed_queries import take_rows_query, take_payload, comment_payload
+from app.utils.cursor import Cursor, InvalidCursor, encode_cursor, decode_cursor
+
+# The signed-in user's own activity, newest first. Each page is one query
+# walking an (user_id, created_at DESC, id DESC) index from the cursor, with
+# comment counts and liked status computed in the same query.
+
+router = APIRouter(prefix="/me", tags=["me"])
+
+def decode_page(cursor: str | None, sort: str) -> Cursor | None:
+    if not cursor:
+        return None
+    try:
+        return decode_cursor(cursor, sort)
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+# Keyset condition for rows older than the cursor, by (created_at, id)
+def older_than(page: Cursor, created_at, row_id):
+    return (created_at < page.timestamp) | ((created_at == page.timestamp) & (row_id < page.id))
+
+def next_page(rows: list, limit: int, sort: str, created_at: str = "created_at", row_id: str = "id"):
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(Cursor(sort, getattr(last, created_at), getattr(last, row_id)))
+
+@router.get("/takes", response_model=TakesListResponse)
+async def get_my_takes(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: str | None = Query(None),
+    user_id: UUID = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db),
+):
+    page = decode_page(cursor, "me_takes")
+
+    query = take_rows_query(user_id).where(Take.user_id == user_id)
+    if page:
+        query = query.where(older_than(page, Take.created_at, Take.id))
+    query = query.order_by(Take.created_at.desc(), Take.id.desc()).limit(limit + 1)
+
+    result = await db.execute(query)
+    takes, next_cursor = next_page(result.all(), limit, "me_takes")
+
+    return ORJSONResponse({
+        "takes": [take_payload(take) for take in takes],
+        "next_cursor": next_cursor,
+    })
+
+@router.get("/comments", response_model=CommentsPageResponse)
+async def get_my_comments(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: str | None = Query(None),
+    user_id: UUID = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db),
+):
+    page = decode_page(cursor, "me_comments")
+
+    query = (
+        select(Comment.id, Comment.take_id, Comment.content, User.username, Comment.created_at)
+        .join(User, User.id == Comment.user_id)
+        .join(Take, (Take.id == Comment.take_id) & (Take.created_at == Comment.take_created_at))
+        .where(Comment.user_id == user_id, Comment.is_hidden == False, Take.is_hidden == False)
+        .execution_options(query_name="my_comments")
+    )
+    if page:
+        query = query.where(older_than(page, Comment.created_at, Comment.id))
+    query = query.order_by(Comment.created_at.desc(), Comment.id.desc()).limit(limit + 1)
+
+    result = await db.execute(query)
+    comments, next_cursor = next_page(result.all(), limit, "me_comments")
+
+    return ORJSONResponse({
+        "comments": [comment_payload(comment) for comment in comments],
+        "next_cursor": next_cursor,
+    })
+
+# Takes the user liked, most recently liked first
+@router.get("/likes", response_model=TakesListResponse)
+async def get_my_likes(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: str | None = Query(None),
+    user_id: UUID = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db),
+):
+    page = decode_page(cursor, "me_likes")
+
+    query = (
+        take_rows_query(user_id)
+        .add_columns(Like.id.label("like_id"), Like.created_at.label("liked_at"))
+        .join(Like, (Like.take_id == Take.id) & (Like.take_created_at == Take.created_at))
+        .where(Like.user_id == user_id)
+        .execution_options(query_name="my_likes")
+    )
+    if page:
+        query = query.where(older_than(page, Like.created_at, Like.id))
+    query = query.order_by(Like.created_at.desc(), Like.id.desc()).limit(limit + 1)
+
+    result = await db.execute(query)
+    takes, next_cursor = next_page(result.all(), limit, "me_likes", created_at="liked_at", row_id="like_id")
+
+    return ORJSONResponse({
+        "takes": [take_payload(take) for take in takes],
+        "next_cursor": next_cursor,
+    })
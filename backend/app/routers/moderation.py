@@ -0,0 +1,118 @@
+from collections import defaultdict
+from enum import Enum
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_db
+from app.dependencies import require_admin
+from app.schemas.schemas import ModerationQueueResponse, ModerationAction, ModerationActionResponse
+from app.utils.cursor import Cursor, InvalidCursor, encode_cursor, decode_cursor
+from app.utils.moderation_queries import QUEUE_SORTS, moderate_statement, moderation_queue_query
+from app.utils.outbox import queue_change, queue_event, queue_leaderboard_reset
+
+# Moderation queue: flagged takes and comments, worked through page by page and
+# cleared in bulk. Hiding or unhiding takes an item out of the queue.
+
+router = APIRouter(prefix="/admin/moderation", tags=["admin"], dependencies=[Depends(require_admin)])
+
+class QueueSort(str, Enum):
+    reports = "reports"
+    toxicity = "toxicity"
+
+class TargetType(str, Enum):
+    take = "take"
+    comment = "comment"
+
+@router.get("", response_model=ModerationQueueResponse)
+async def get_moderation_queue(
+    sort: QueueSort = Query(QueueSort.reports),
+    target_type: TargetType | None = Query(None),
+    limit: int = Query(50, ge=1, le=100),
+    cursor: str | None = Query(None),
+    db: AsyncSession = Depends(get_db),
+):
+    cursor_sort = QUEUE_SORTS[sort.value]
+    page = None
+    if cursor:
+        try:
+            page = decode_cursor(cursor, cursor_sort)
+        except InvalidCursor:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    query = moderation_queue_query(sort.value, page, limit, target_type.value if target_type else None)
+    result = await db.execute(query)
+    items = result.all()
+
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        last = items[-1]
+        next_cursor = encode_cursor(Cursor(cursor_sort, last.created_at, last.id, float(last.score)))
+
+    return ORJSONResponse({
+        "items": [
+            {
+                "target_type": item.target_type,
+                "id": item.id,
+                "take_id": item.take_id,
+                "content": item.content,
+                "username": item.username,
+                "created_at": item.created_at,
+                "report_count": item.report_count,
+                "toxicity_score": item.toxicity_score,
+                "is_hidden": item.is_hidden,
+            }
+            for item in items
+        ],
+        "next_cursor": next_cursor,
+    })
+
+# Hide or unhide takes and comments in one transaction. Clients get one event
+# for all the takes that changed and one per take for its comments.
+@router.post("/actions", response_model=ModerationActionResponse)
+async def moderate(
+    request: ModerationAction,
+    db: AsyncSession = Depends(get_db),
+):
+    hide = request.action == "hide"
+    take_ids = []
+    comment_ids = []
+    changed_takes = []
+    changed_comments = defaultdict(list)
+
+    if request.takes:
+        result = await db.execute(moderate_statement("take", request.takes, hide))
+        for row in result:
+            take_ids.append(row.id)
+            if row.was_hidden != hide:
+                changed_takes.append(row.id)
+
+    if request.comments:
+        result = await db.execute(moderate_statement("comment", request.comments, hide))
+        for row in result:
+            comment_ids.append(row.id)
+            if row.was_hidden != hide:
+                changed_comments[row.take_id].append(row.id)
+
+    if changed_takes or changed_comments:
+        queue_change(db, *changed_takes, *changed_comments)
+    if changed_takes:
+        queue_leaderboard_reset(db)
+        queue_event(db, "feed", {
+            "type": f"{request.action}_takes",
+            "data": {
+                "ids": [str(take_id) for take_id in changed_takes],
+            }
+        })
+    for take_id, ids in changed_comments.items():
+        queue_event(db, f"comments:{take_id}", {
+            "type": f"{request.action}_comments",
+            "data": {
+                "take_id": str(take_id),
+                "ids": [str(comment_id) for comment_id in ids],
+            }
+        })
+
+    return ModerationActionResponse(takes=take_ids, comments=comment_ids)
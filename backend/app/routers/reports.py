@@ -2,11 +2,15 @@ from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
+from app.config import get_settings
 from app.database import get_db
-from app.models import User, Take, Comment, Report
+from app.models import User, Comment
 from app.schemas.schemas import ReportCreate, ReportResponse
 from app.dependencies import get_optional_user
+from app.utils.outbox import queue_change, queue_event, queue_leaderboard_reset
 from app.utils.rate_limit import check_rate_limit, get_client_ip
+from app.utils.report_queries import record_report_statement
+from app.utils.take_cache import load_visible_take
 
 router = APIRouter(prefix="/reports", tags=["reports"])
 
@@ -17,6 +21,7 @@ async def create_report(
     current_user: User | None = Depends(get_optional_user),
     db: AsyncSession = Depends(get_db),
 ):
+    settings = get_settings()
 
     # Get client IP for rate limiting
     client_ip = await get_client_ip(request)
@@ -30,27 +35,52 @@ async def create_report(
 
     # Verify target exists and is not hidden
     if report_data.target_type == "take":
-        result = await db.execute(
-            select(Take).where(Take.id == report_data.target_id, Take.is_hidden == False)
-        )
-        target = result.scalar_one_or_none()
+        target = await load_visible_take(db, report_data.target_id)
         if not target:
             raise HTTPException(status_code=404, detail="Take not found")
+        take_created_at = target.created_at
     elif report_data.target_type == "comment":
         result = await db.execute(
-            select(Comment).where(Comment.id == report_data.target_id, Comment.is_hidden == False)
+            select(Comment.take_created_at).where(Comment.id == report_data.target_id, Comment.is_hidden == False)
         )
-        target = result.scalar_one_or_none()
-        if not target:
+        take_created_at = result.scalar_one_or_none()
+        if not take_created_at:
             raise HTTPException(status_code=404, detail="Comment not found")
 
-    # Create report
-    report = Report(
+    # Each reporter counts once per target; repeats are accepted but ignored
+    reporter_key = f"user:{current_user.id}" if current_user else f"ip:{client_ip}"
+    result = await db.execute(record_report_statement(
         target_type=report_data.target_type,
         target_id=report_data.target_id,
+        take_created_at=take_created_at,
         reason=report_data.reason,
+        reporter_key=reporter_key,
         reporter_user_id=current_user.id if current_user else None,
-    )
-    db.add(report)
+        flag_threshold=settings.report_flag_threshold,
+        hide_threshold=settings.report_hide_threshold,
+    ))
+    target = result.one_or_none()
+
+    # The update only matches visible targets, so a hidden row back means this
+    # report crossed the hide threshold: take it down everywhere now
+    if target and target.is_hidden:
+        if report_data.target_type == "take":
+            queue_change(db, report_data.target_id)
+            queue_leaderboard_reset(db)
+            queue_event(db, "feed", {
+                "type": "delete_take",
+                "data": {
+                    "id": str(report_data.target_id),
+                }
+            })
+        else:
+            queue_change(db, target.take_id)
+            queue_event(db, f"comments:{target.take_id}", {
+                "type": "delete_comment",
+                "data": {
+                    "id": str(report_data.target_id),
+                    "take_id": str(target.take_id),
+                }
+            })
 
-    return ReportResponse(message="Report submitted successfully")
\ No newline at end of file
+    return ReportResponse(message="Report submitted successfully")
@@ -1,21 +1,44 @@
-from datetime import datetime, timedelta, timezone
+import logging
+from datetime import datetime, timedelta
 from enum import Enum
 from uuid import UUID
-import base64
-import json
+
+import redis.asyncio as redis
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_
-from sqlalchemy.orm import joinedload
+from sqlalchemy import select, update
 
 from app.database import get_db
 from app.models import User, Take, Like, Comment
-from app.schemas.schemas import TakeCreate, TakeResponse, TakesListResponse, CommentCreate, CommentResponse, CommentsListResponse
-from app.dependencies import get_current_user, get_optional_user
+from app.schemas.schemas import (
+    TakeCreate, TakeResponse, TakesListResponse, CommentCreate, CommentResponse, CommentsListResponse, CommentsPageResponse,
+    LikeStatusRequest, LikeStatusResponse, LikeBatchRequest, LikeBatchResponse, MAX_BATCH_IDS,
+)
+from app.dependencies import get_current_user, get_current_user_id, get_optional_user_id
 from app.utils.profanity import contains_profanity
-from app.utils.redis_client import publish_message
 from app.utils.rate_limit import check_rate_limit
+from app.utils.feed_queries import (
+    hot_score, take_rows_query, take_payload, top_today_query, search_takes_query, search_comments_query,
+    comment_payload,
+)
+from app.utils.like_queries import (
+    add_like_statement, adjust_like_count_statement, liked_ids_query, remove_like_statement,
+    toggle_likes_statement, user_liked_query,
+)
+from app.utils.take_cache import cached_take_payload, load_take, load_visible_take
+from app.utils.leaderboard import LEADERBOARD_KEY, LEADERBOARD_VERSION_KEY, parse_leaderboard
+from app.utils.redis_client import redis_batch
+from app.utils.cursor import Cursor, InvalidCursor, encode_cursor, decode_cursor
+from app.utils.profiling import profiled
+from app.utils.etag import (
+    FEED_VERSION_KEY, cache_headers, etag_matches, get_versions, make_etag,
+    not_modified, parse_versions, take_version_key, time_bucket,
+)
+from app.utils.outbox import queue_change, queue_event, queue_leaderboard_reset
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/takes", tags=["takes"])
 
@@ -24,23 +47,6 @@ class SortOption(str, Enum):
     hottest_24h = "hottest_24h"
     hottest_7d = "hottest_7d"
 
-def hot_score(likes: int, created_at: datetime) -> float:
-    now = datetime.now(timezone.utc)
-    if created_at.tzinfo is None:
-        created_at = created_at.replace(tzinfo=timezone.utc)
-    age_hours = (now - created_at).total_seconds() / 3600
-    gravity = 1.5
-    return likes / ((age_hours + 2) ** gravity)
-
-def encode_cursor(created_at: datetime, take_id: UUID) -> str:
-    data = {"created_at": created_at.isoformat(), "id": str(take_id)}
-    return base64.urlsafe_b64encode(json.dumps(data).encode()).decode()
-
-def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
-    data = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
-    return datetime.fromisoformat(data["created_at"]), UUID(data["id"])
-
-
 @router.post("", response_model=TakeResponse)
 async def create_take(
     http_request: Request,
@@ -77,7 +83,8 @@ async def create_take(
     )
 
     # Broadcast new take to feed subscribers
-    await publish_message("feed", {
+    queue_change(db)
+    queue_event(db, "feed", {
         "type": "new_take",
         "data": {
             "id": str(response.id),
@@ -93,193 +100,319 @@ async def create_take(
     return response
 
 @router.get("", response_model=TakesListResponse)
+@profiled("get_takes")
 async def get_takes(
+    request: Request,
     sort: SortOption = Query(SortOption.newest),
     limit: int = Query(20, ge=1, le=100),
     cursor: str | None = Query(None),
-    current_user: User | None = Depends(get_optional_user),
+    ids: str | None = Query(None, description=f"Comma-separated take ids (at most {MAX_BATCH_IDS}) to fetch instead of a feed page"),
+    user_id: UUID | None = Depends(get_optional_user_id),
     db: AsyncSession = Depends(get_db),
 ):
+    if ids is not None:
+        return await get_takes_by_ids(request, ids, user_id, db)
+
+    page = None
+    if cursor:
+        try:
+            page = decode_cursor(cursor, sort.value)
+        except InvalidCursor:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    # Answer revalidations from the feed version before touching the database
+    etag = None
+    versions = await get_versions(FEED_VERSION_KEY)
+    if versions:
+        bucket = time_bucket() if sort != SortOption.newest and not page else None
+        etag = make_etag("takes", versions[0], sort.value, limit, cursor, user_id, bucket)
+        if etag_matches(request, etag):
+            return not_modified(etag, user_id)
+
     # Base query - exclude hidden takes
-    query = select(Take).where(Take.is_hidden == False).options(joinedload(Take.user))
+    query = take_rows_query(user_id)
+
+    # Hot sorts rank every page against the time the first page was ranked,
+    # so scores (and the time window) don't shift underneath the cursor
+    now = page.timestamp if page and sort != SortOption.newest else datetime.utcnow()
 
     # Apply time filter for hottest sorts (use naive datetime to match DB)
     if sort == SortOption.hottest_24h:
-        cutoff = datetime.utcnow() - timedelta(hours=24)
-        query = query.where(Take.created_at >= cutoff)
+        query = query.where(Take.created_at >= now - timedelta(hours=24))
     elif sort == SortOption.hottest_7d:
-        cutoff = datetime.utcnow() - timedelta(days=7)
-        query = query.where(Take.created_at >= cutoff)
-
-    # Apply cursor pagination (for newest sort)
-    if cursor and sort == SortOption.newest:
-        cursor_created_at, cursor_id = decode_cursor(cursor)
-        query = query.where(
-            (Take.created_at < cursor_created_at) |
-            ((Take.created_at == cursor_created_at) & (Take.id < cursor_id))
-        )
+        query = query.where(Take.created_at >= now - timedelta(days=7))
 
-    # Order by created_at for newest, fetch all for hottest
+    # Keyset pagination on (created_at, id) for newest and (score, id) for
+    # hottest. Postgres only evaluates the like/comment subqueries for the
+    # rows that survive the LIMIT.
     if sort == SortOption.newest:
+        if page:
+            query = query.where(
+                (Take.created_at < page.timestamp) |
+                ((Take.created_at == page.timestamp) & (Take.id < page.id))
+            )
         query = query.order_by(Take.created_at.desc(), Take.id.desc())
-        query = query.limit(limit + 1)  # Fetch one extra to check for next page
     else:
-        # For hottest, we need to fetch more and sort by score in Python
-        query = query.limit(500)
+        score = hot_score(now)
+        query = query.add_columns(score.label("score"))
+        if page:
+            query = query.where(
+                (score < page.score) |
+                ((score == page.score) & (Take.id < page.id))
+            )
+        query = query.order_by(score.desc(), Take.id.desc())
+    query = query.limit(limit + 1)  # Fetch one extra to check for next page
 
     result = await db.execute(query)
-    takes = result.scalars().unique().all()
-
-    # For hottest sorts, calculate scores and sort
-    if sort in (SortOption.hottest_24h, SortOption.hottest_7d):
-        takes_with_scores = [(t, hot_score(t.like_count, t.created_at)) for t in takes]
-        takes_with_scores.sort(key=lambda x: x[1], reverse=True)
-        takes = [t for t, _ in takes_with_scores[:limit]]
-        has_more = len(takes_with_scores) > limit
-    else:
-        has_more = len(takes) > limit
-        takes = list(takes[:limit])
+    takes = result.all()
 
-    # Get user's likes if authenticated
-    user_liked_ids = set()
-    if current_user and takes:
-        take_ids = [t.id for t in takes]
-        likes_result = await db.execute(
-            select(Like.take_id).where(
-                and_(Like.user_id == current_user.id, Like.take_id.in_(take_ids))
-            )
-        )
-        user_liked_ids = {row[0] for row in likes_result.fetchall()}
+    has_more = len(takes) > limit
+    takes = takes[:limit]
 
-    # Get comment counts for all takes
-    comment_counts = {}
-    if takes:
-        take_ids = [t.id for t in takes]
-        counts_result = await db.execute(
-            select(Comment.take_id, func.count(Comment.id))
-            .where(and_(Comment.take_id.in_(take_ids), Comment.is_hidden == False))
-            .group_by(Comment.take_id)
-        )
-        comment_counts = {row[0]: row[1] for row in counts_result.fetchall()}
-
-    take_responses = [
-        TakeResponse(
-            id=take.id,
-            content=take.content,
-            like_count=take.like_count,
-            comment_count=comment_counts.get(take.id, 0),
-            created_at=take.created_at,
-            username=take.user.username,
-            user_liked=take.id in user_liked_ids,
-        )
-        for take in takes
-    ]
+    next_cursor = None
+    if has_more and takes:
+        last_take = takes[-1]
+        if sort == SortOption.newest:
+            next_cursor = encode_cursor(Cursor(sort.value, last_take.created_at, last_take.id))
+        else:
+            next_cursor = encode_cursor(Cursor(sort.value, now, last_take.id, last_take.score))
+
+    return ORJSONResponse(
+        {
+            "takes": [take_payload(take) for take in takes],
+            "next_cursor": next_cursor,
+        },
+        headers=cache_headers(etag, user_id),
+    )
+
+# GET /takes?ids=a,b,c: the visible takes among `ids`, in the order given,
+# in one query
+async def get_takes_by_ids(request: Request, ids: str, user_id: UUID | None, db: AsyncSession):
+    try:
+        take_ids = list(dict.fromkeys(UUID(value.strip()) for value in ids.split(",") if value.strip()))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid take id")
+    if not take_ids or len(take_ids) > MAX_BATCH_IDS:
+        raise HTTPException(status_code=400, detail=f"Pass between 1 and {MAX_BATCH_IDS} take ids")
+
+    etag = None
+    versions = await get_versions(*(take_version_key(take_id) for take_id in take_ids))
+    if versions:
+        etag = make_etag("takes_by_id", *take_ids, *versions, user_id)
+        if etag_matches(request, etag):
+            return not_modified(etag, user_id)
+
+    result = await db.execute(take_rows_query(user_id).where(Take.id.in_(take_ids)))
+    rows = {row.id: row for row in result.all()}
+
+    return ORJSONResponse(
+        {
+            "takes": [take_payload(rows[take_id]) for take_id in take_ids if take_id in rows],
+            "next_cursor": None,
+        },
+        headers=cache_headers(etag, user_id),
+    )
+
+@router.post("/likes/status", response_model=LikeStatusResponse)
+async def get_like_status(
+    request: LikeStatusRequest,
+    user_id: UUID = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db),
+):
+    if not request.take_ids:
+        return ORJSONResponse({"liked": []})
+
+    result = await db.execute(liked_ids_query(user_id, request.take_ids))
+    return ORJSONResponse({"liked": result.scalars().all()})
+
+# Apply several likes and unlikes in one transaction and one statement
+@router.post("/likes/batch", response_model=LikeBatchResponse)
+async def toggle_likes(
+    request: LikeBatchRequest,
+    user_id: UUID = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db),
+):
+    toggles = len(request.like) + len(request.unlike)
+    if not toggles:
+        return ORJSONResponse({"like_counts": {}})
+
+    # Shares the like rate limit, counting each toggle
+    await check_rate_limit(
+        key=f"like:{user_id}",
+        max_requests=30,
+        window_seconds=3600,
+        cost=toggles,
+    )
+
+    result = await db.execute(toggle_likes_statement(user_id, request.like, request.unlike))
+    like_counts = dict(result.all())
+
+    # Broadcast like count updates to feed subscribers
+    if like_counts:
+        queue_change(db, *like_counts)
+        for take_id, like_count in like_counts.items():
+            queue_event(db, "feed", {"type": "like_update", "data": {"id": str(take_id), "like_count": like_count}})
+
+    return ORJSONResponse({"like_counts": {str(take_id): count for take_id, count in like_counts.items()}})
+
+# Ranked full-text search (with trigram fuzzy matching) over visible takes
+@router.get("/search", response_model=TakesListResponse)
+async def search_takes(
+    q: str = Query(..., min_length=2, max_length=200),
+    limit: int = Query(20, ge=1, le=50),
+    cursor: str | None = Query(None),
+    fuzzy: bool = Query(True),
+    user_id: UUID | None = Depends(get_optional_user_id),
+    db: AsyncSession = Depends(get_db),
+):
+    page = None
+    if cursor:
+        try:
+            page = decode_cursor(cursor, "search")
+        except InvalidCursor:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    # Keyset pagination on (rank, id)
+    query, rank = search_takes_query(q, user_id, fuzzy)
+    if page:
+        query = query.where((rank < page.score) | ((rank == page.score) & (Take.id < page.id)))
+    query = query.order_by(rank.desc(), Take.id.desc()).limit(limit + 1)
+
+    result = await db.execute(query)
+    takes = result.all()
 
     next_cursor = None
-    if has_more and sort == SortOption.newest and takes:
+    if len(takes) > limit:
+        takes = takes[:limit]
         last_take = takes[-1]
-        next_cursor = encode_cursor(last_take.created_at, last_take.id)
+        next_cursor = encode_cursor(Cursor("search", last_take.created_at, last_take.id, last_take.rank))
+
+    return ORJSONResponse({
+        "takes": [take_payload(take) for take in takes],
+        "next_cursor": next_cursor,
+    })
+
+@router.get("/search/comments", response_model=CommentsPageResponse)
+async def search_comments(
+    q: str = Query(..., min_length=2, max_length=200),
+    limit: int = Query(20, ge=1, le=50),
+    cursor: str | None = Query(None),
+    fuzzy: bool = Query(True),
+    db: AsyncSession = Depends(get_db),
+):
+    page = None
+    if cursor:
+        try:
+            page = decode_cursor(cursor, "search_comments")
+        except InvalidCursor:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    query, rank = search_comments_query(q, fuzzy)
+    if page:
+        query = query.where((rank < page.score) | ((rank == page.score) & (Comment.id < page.id)))
+    query = query.order_by(rank.desc(), Comment.id.desc()).limit(limit + 1)
 
-    return TakesListResponse(takes=take_responses, next_cursor=next_cursor)
+    result = await db.execute(query)
+    comments = result.all()
+
+    next_cursor = None
+    if len(comments) > limit:
+        comments = comments[:limit]
+        last_comment = comments[-1]
+        next_cursor = encode_cursor(Cursor("search_comments", last_comment.created_at, last_comment.id, last_comment.rank))
+
+    return ORJSONResponse({
+        "comments": [comment_payload(comment) for comment in comments],
+        "next_cursor": next_cursor,
+    })
 
 @router.get("/top/today", response_model=list[TakeResponse])
 async def get_top_takes_today(
-    current_user: User | None = Depends(get_optional_user),
+    request: Request,
+    user_id: UUID | None = Depends(get_optional_user_id),
     db: AsyncSession = Depends(get_db),
 ):
+    # The versions and the leaderboard come back in one round trip. A 304
+    # wastes the leaderboard read, but that's cheaper than a second trip.
+    versions = entries = None
+    try:
+        batch = await redis_batch()
+        version_values = batch.add("mget", [FEED_VERSION_KEY, LEADERBOARD_VERSION_KEY])
+        leaderboard = batch.add("get", LEADERBOARD_KEY)
+        await batch.execute()
+        versions = parse_versions(version_values.value)
+        entries = parse_leaderboard(leaderboard.value)
+    except redis.RedisError:
+        logger.warning("Could not read feed version and leaderboard", exc_info=True)
+
+    # The body follows the leaderboard, which the refresher rewrites on its own
+    # schedule, so the ETag is keyed on the stored leaderboard's digest. The
+    # feed version covers the viewer's user_liked. Without a stored leaderboard
+    # the SQL fallback ranks live, which drifts with the clock.
+    etag = None
+    if versions:
+        feed_version, leaderboard_version = versions
+        if entries is None or version_values.value[1] is None:
+            leaderboard_version = time_bucket()
+        etag = make_etag("top_today", feed_version, leaderboard_version, user_id)
+        if etag_matches(request, etag):
+            return not_modified(etag, user_id)
+
     # Last 24 hours
     cutoff = datetime.utcnow() - timedelta(hours=24)
 
-    # Get all non-hidden takes from last 24 hours
-    result = await db.execute(
-        select(Take)
-        .where(Take.is_hidden == False, Take.created_at >= cutoff)
-        .options(joinedload(Take.user))
-    )
-    takes = result.scalars().unique().all()
-
-    if not takes:
-        return []
-
-    # Get comment counts
-    take_ids = [t.id for t in takes]
-    counts_result = await db.execute(
-        select(Comment.take_id, func.count(Comment.id))
-        .where(and_(Comment.take_id.in_(take_ids), Comment.is_hidden == False))
-        .group_by(Comment.take_id)
-    )
-    comment_counts = {row[0]: row[1] for row in counts_result.fetchall()}
-
-    # Sort by engagement score (likes + comments) and get top 3
-    sorted_takes = sorted(
-        takes,
-        key=lambda t: t.like_count + comment_counts.get(t.id, 0),
-        reverse=True
-    )[:3]
+    # Normally served from the leaderboard kept warm in the background
+    if entries is None:
+        # Leaderboard is cold (fresh deploy or refresher down): top-k in SQL
+        result = await db.execute(top_today_query(cutoff, user_id))
+        return ORJSONResponse(
+            [take_payload(take) for take in result.all()],
+            headers=cache_headers(etag, user_id),
+        )
 
     # Get user's likes if authenticated
     user_liked_ids = set()
-    if current_user and sorted_takes:
-        top_ids = [t.id for t in sorted_takes]
+    if user_id and entries:
         likes_result = await db.execute(
             select(Like.take_id).where(
-                and_(Like.user_id == current_user.id, Like.take_id.in_(top_ids))
+                Like.user_id == user_id,
+                Like.take_id.in_([UUID(entry["id"]) for entry in entries]),
+                Like.take_created_at >= min(datetime.fromisoformat(entry["created_at"]) for entry in entries),
             )
         )
         user_liked_ids = {row[0] for row in likes_result.fetchall()}
 
-    return [
-        TakeResponse(
-            id=take.id,
-            content=take.content,
-            like_count=take.like_count,
-            comment_count=comment_counts.get(take.id, 0),
-            created_at=take.created_at,
-            username=take.user.username,
-            user_liked=take.id in user_liked_ids,
-        )
-        for take in sorted_takes
-    ]
+    return ORJSONResponse(
+        [{**entry, "user_liked": UUID(entry["id"]) in user_liked_ids} for entry in entries],
+        headers=cache_headers(etag, user_id),
+    )
 
 
 @router.get("/{take_id}", response_model=TakeResponse)
 async def get_take(
+    request: Request,
     take_id: UUID,
-    current_user: User | None = Depends(get_optional_user),
+    user_id: UUID | None = Depends(get_optional_user_id),
     db: AsyncSession = Depends(get_db),
 ):
-    result = await db.execute(
-        select(Take).where(Take.id == take_id, Take.is_hidden == False).options(joinedload(Take.user))
-    )
-    take = result.scalar_one_or_none()
+    etag = None
+    versions = await get_versions(take_version_key(take_id))
+    if versions:
+        etag = make_etag("take", take_id, versions[0], user_id)
+        if etag_matches(request, etag):
+            return not_modified(etag, user_id)
+
+    # Served from the take cache when it holds this version of the take
+    take = await load_visible_take(db, take_id, versions[0] if versions else None)
 
     if not take:
         raise HTTPException(status_code=404, detail="Take not found")
 
-    # Check if user liked this take
     user_liked = False
-    if current_user:
-        like_result = await db.execute(
-            select(Like).where(Like.take_id == take_id, Like.user_id == current_user.id)
-        )
-        user_liked = like_result.scalar_one_or_none() is not None
-
-    # Get comment count
-    comment_count_result = await db.execute(
-        select(func.count(Comment.id))
-        .where(Comment.take_id == take_id, Comment.is_hidden == False)
-    )
-    comment_count = comment_count_result.scalar_one()
+    if user_id:
+        user_liked = await db.scalar(user_liked_query(user_id, take_id, take.created_at))
 
-    return TakeResponse(
-        id=take.id,
-        content=take.content,
-        like_count=take.like_count,
-        comment_count=comment_count,
-        created_at=take.created_at,
-        username=take.user.username,
-        user_liked=user_liked,
-    )
+    return ORJSONResponse(cached_take_payload(take, user_liked), headers=cache_headers(etag, user_id))
 
 @router.delete("/{take_id}")
 async def delete_take(
@@ -287,10 +420,7 @@ async def delete_take(
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    result = await db.execute(
-        select(Take).where(Take.id == take_id)
-    )
-    take = result.scalar_one_or_none()
+    take = await load_take(db, take_id)
 
     if not take:
         raise HTTPException(status_code=404, detail="Take not found")
@@ -298,10 +428,17 @@ async def delete_take(
     if take.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized to delete this take")
 
-    take.is_hidden = True
+    await db.execute(
+        update(Take)
+        .where(Take.id == take_id, Take.created_at == take.created_at)
+        .values(is_hidden=True)
+        .execution_options(synchronize_session=False)
+    )
 
     # Broadcast delete to feed subscribers
-    await publish_message("feed", {
+    queue_change(db, take_id)
+    queue_leaderboard_reset(db)
+    queue_event(db, "feed", {
         "type": "delete_take",
         "data": {
             "id": str(take_id),
@@ -311,6 +448,7 @@ async def delete_take(
     return {"message": "Take deleted"}
 
 @router.post("/{take_id}/like")
+@profiled("like_take")
 async def like_take(
     take_id: UUID,
     current_user: User = Depends(get_current_user),
@@ -324,34 +462,26 @@ async def like_take(
     )
 
     # Check if take exists
-    result = await db.execute(
-        select(Take).where(Take.id == take_id, Take.is_hidden == False)
-    )
-    take = result.scalar_one_or_none()
+    take = await load_visible_take(db, take_id)
 
     if not take:
         raise HTTPException(status_code=404, detail="Take not found")
 
-    # Check if already liked
-    result = await db.execute(
-        select(Like).where(Like.take_id == take_id, Like.user_id == current_user.id)
-    )
-    existing_like = result.scalar_one_or_none()
-
-    if existing_like:
+    # Create like (a no-op if already liked) and increment count transactionally
+    result = await db.execute(add_like_statement(current_user.id, take_id, take.created_at))
+    if result.scalar_one_or_none() is None:
         return {"message": "Already liked"}
 
-    # Create like and increment count transactionally
-    like = Like(take_id=take_id, user_id=current_user.id)
-    db.add(like)
-    take.like_count += 1
+    result = await db.execute(adjust_like_count_statement(take_id, take.created_at, 1))
+    like_count = result.scalar_one()
 
     # Broadcast like count update to feed subscribers
-    await publish_message("feed", {
+    queue_change(db, take_id)
+    queue_event(db, "feed", {
         "type": "like_update",
         "data": {
             "id": str(take_id),
-            "like_count": take.like_count,
+            "like_count": like_count,
         }
     })
 
@@ -371,33 +501,26 @@ async def unlike_take(
     )
 
     # Check if take exists
-    result = await db.execute(
-        select(Take).where(Take.id == take_id, Take.is_hidden == False)
-    )
-    take = result.scalar_one_or_none()
+    take = await load_visible_take(db, take_id)
 
     if not take:
         raise HTTPException(status_code=404, detail="Take not found")
 
-    # Find and delete like
-    result = await db.execute(
-        select(Like).where(Like.take_id == take_id, Like.user_id == current_user.id)
-    )
-    like = result.scalar_one_or_none()
-
-    if not like:
+    # Delete like and decrement count transactionally
+    result = await db.execute(remove_like_statement(current_user.id, take_id, take.created_at))
+    if result.scalar_one_or_none() is None:
         return {"message": "Not liked"}
 
-    # Delete like and decrement count transactionally
-    await db.delete(like)
-    take.like_count = max(0, take.like_count - 1)  # Prevent negative counts
+    result = await db.execute(adjust_like_count_statement(take_id, take.created_at, -1))
+    like_count = result.scalar_one()
 
     # Broadcast like count update to feed subscribers
-    await publish_message("feed", {
+    queue_change(db, take_id)
+    queue_event(db, "feed", {
         "type": "like_update",
         "data": {
             "id": str(take_id),
-            "like_count": take.like_count,
+            "like_count": like_count,
         }
     })
 
@@ -405,39 +528,40 @@ async def unlike_take(
 
 @router.get("/{take_id}/comments", response_model=CommentsListResponse)
 async def get_comments(
+    request: Request,
     take_id: UUID,
     db: AsyncSession = Depends(get_db),
 ):
+    # Comments aren't personalized, so every viewer shares one ETag
+    etag = None
+    versions = await get_versions(take_version_key(take_id))
+    if versions:
+        etag = make_etag("comments", take_id, versions[0])
+        if etag_matches(request, etag):
+            return not_modified(etag, None)
+
     # Check if take exists
-    result = await db.execute(
-        select(Take).where(Take.id == take_id, Take.is_hidden == False)
-    )
-    take = result.scalar_one_or_none()
+    take = await load_visible_take(db, take_id)
 
     if not take:
         raise HTTPException(status_code=404, detail="Take not found")
 
     # Get comments ordered by created_at (ascending order)
     result = await db.execute(
-        select(Comment)
-        .where(Comment.take_id == take_id, Comment.is_hidden == False)
-        .options(joinedload(Comment.user))
+        select(Comment.id, Comment.take_id, Comment.content, User.username, Comment.created_at)
+        .join(User, User.id == Comment.user_id)
+        .where(
+            Comment.take_id == take_id,
+            Comment.take_created_at == take.created_at,
+            Comment.is_hidden == False,
+        )
         .order_by(Comment.created_at.asc())
     )
-    comments = result.scalars().unique().all()
-
-    comment_responses = [
-        CommentResponse(
-            id=comment.id,
-            take_id=comment.take_id,
-            content=comment.content,
-            username=comment.user.username,
-            created_at=comment.created_at,
-        )
-        for comment in comments
-    ]
 
-    return CommentsListResponse(comments=comment_responses)
+    return ORJSONResponse(
+        {"comments": [row._asdict() for row in result.all()]},
+        headers=cache_headers(etag, None),
+    )
 
 @router.post("/{take_id}/comments", response_model=CommentResponse)
 async def create_comment(
@@ -454,10 +578,7 @@ async def create_comment(
     )
 
     # Check if take exists
-    result = await db.execute(
-        select(Take).where(Take.id == take_id, Take.is_hidden == False)
-    )
-    take = result.scalar_one_or_none()
+    take = await load_visible_take(db, take_id)
 
     if not take:
         raise HTTPException(status_code=404, detail="Take not found")
@@ -469,6 +590,7 @@ async def create_comment(
     # Create comment
     comment = Comment(
         take_id=take_id,
+        take_created_at=take.created_at,
         user_id=current_user.id,
         content=request.content,
     )
@@ -485,7 +607,8 @@ async def create_comment(
     )
 
     # Broadcast new comment to take's comment subscribers
-    await publish_message(f"comments:{take_id}", {
+    queue_change(db, take_id)
+    queue_event(db, f"comments:{take_id}", {
         "type": "new_comment",
         "data": {
             "id": str(response.id),
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr, field_validator
+from pydantic import BaseModel, EmailStr, Field, field_validator
 from uuid import UUID
 from datetime import datetime
 
@@ -60,6 +60,43 @@ class TakesListResponse(BaseModel):
     takes: list[TakeResponse]
     next_cursor: str | None = None
 
+# Batch schemas
+MAX_BATCH_IDS = 100
+# Matches the hourly like rate limit, which a batch counts once per toggle
+MAX_LIKE_TOGGLES = 30
+
+class LikeStatusRequest(BaseModel):
+    take_ids: list[UUID]
+
+    @field_validator("take_ids")
+    @classmethod
+    def validate_take_ids(cls, v: list[UUID]) -> list[UUID]:
+        if len(v) > MAX_BATCH_IDS:
+            raise ValueError(f"At most {MAX_BATCH_IDS} take ids per request")
+        return v
+
+class LikeStatusResponse(BaseModel):
+    liked: list[UUID]
+
+class LikeBatchRequest(BaseModel):
+    like: list[UUID] = []
+    # Validated even when omitted, so a like-only body is still checked
+    unlike: list[UUID] = Field(default=[], validate_default=True)
+
+    @field_validator("unlike")
+    @classmethod
+    def validate_toggles(cls, v: list[UUID], info) -> list[UUID]:
+        like = info.data.get("like", [])
+        if len(like) + len(v) > MAX_LIKE_TOGGLES:
+            raise ValueError(f"At most {MAX_LIKE_TOGGLES} toggles per request")
+        if set(like) & set(v):
+            raise ValueError("A take can't be both liked and unliked")
+        return v
+
+class LikeBatchResponse(BaseModel):
+    # New like_count of every take whose count changed
+    like_counts: dict[UUID, int]
+
 # Comment schema
 class CommentCreate(BaseModel):
     content: str
@@ -87,6 +124,10 @@ class CommentResponse(BaseModel):
 class CommentsListResponse(BaseModel):
     comments: list[CommentResponse]
 
+class CommentsPageResponse(BaseModel):
+    comments: list[CommentResponse]
+    next_cursor: str | None = None
+
 # Report schemas
 class ReportCreate(BaseModel):
     target_type: str  # 'take' or 'comment'
@@ -111,4 +152,66 @@ class ReportCreate(BaseModel):
         return v
 
 class ReportResponse(BaseModel):
-    message: str
\ No newline at end of file
+    message: str
+
+# Admin schemas
+class ProfilingUpdate(BaseModel):
+    target: str
+    sample_rate: float
+
+    @field_validator("sample_rate")
+    @classmethod
+    def validate_sample_rate(cls, v: float) -> float:
+        if not 0 <= v <= 1:
+            raise ValueError("sample_rate must be between 0 and 1")
+        return v
+
+class ProfilingStatus(BaseModel):
+    enabled: bool
+    targets: list[str]
+    sample_rates: dict[str, float]
+    samples: dict[str, int]
+
+# Moderation schemas
+class ModerationItem(BaseModel):
+    target_type: str  # 'take' or 'comment'
+    id: UUID
+    take_id: UUID
+    content: str
+    username: str
+    created_at: datetime
+    report_count: int
+    toxicity_score: float | None
+    is_hidden: bool
+
+class ModerationQueueResponse(BaseModel):
+    items: list[ModerationItem]
+    next_cursor: str | None = None
+
+class ModerationAction(BaseModel):
+    action: str  # 'hide' or 'unhide'
+    takes: list[UUID] = []
+    # Validated even when omitted, so the checks below always run
+    comments: list[UUID] = Field(default=[], validate_default=True)
+
+    @field_validator("action")
+    @classmethod
+    def validate_action(cls, v: str) -> str:
+        if v not in ["hide", "unhide"]:
+            raise ValueError("action must be 'hide' or 'unhide'")
+        return v
+
+    @field_validator("comments")
+    @classmethod
+    def validate_targets(cls, v: list[UUID], info) -> list[UUID]:
+        takes = info.data.get("takes", [])
+        if not takes and not v:
+            raise ValueError("Pass at least one take or comment")
+        if len(takes) + len(v) > MAX_BATCH_IDS:
+            raise ValueError(f"At most {MAX_BATCH_IDS} takes and comments per request")
+        return v
+
+class ModerationActionResponse(BaseModel):
+    # Targets found; every one is now out of the queue
+    takes: list[UUID]
+    comments: list[UUID]
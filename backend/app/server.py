@@ -0,0 +1,119 @@
+import argparse
+import logging
+import os
+import shutil
+import socket
+import tempfile
+
+import uvicorn
+from uvicorn._subprocess import get_subprocess
+from uvicorn.protocols.websockets.websockets_impl import WebSocketProtocol
+from uvicorn.supervisors import Multiprocess
+from websockets.extensions.permessage_deflate import ServerPerMessageDeflateFactory
+
+from app.config import get_settings
+from app.utils.websocket_manager import drain_websockets
+
+# Production entry point: `python -m app.server`.
+#
+# uvicorn's CLI only has an on/off switch for permessage-deflate, so the app
+# is started through here to negotiate it with our compression level and
+# context takeover settings, and to drain WebSockets before uvicorn drops them.
+#
+# With --workers N (or WEB_CONCURRENCY) it runs N worker processes, each a
+# complete copy of the app with its own WebSocket hubs, Redis subscriptions,
+# pools and take cache. Every worker binds the port with SO_REUSEPORT so the
+# kernel spreads connections across them; pub/sub already carries every event
+# to every process, and the rest of the shared state lives in Redis and
+# Postgres. Metrics are merged across workers through a temporary directory.
+
+logger = logging.getLogger("uvicorn.error")
+
+# How often the supervisor checks for workers that died
+WORKER_CHECK_SECONDS = 1.0
+
+class DeflateWebSocketProtocol(WebSocketProtocol):
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.config.ws_per_message_deflate:
+            settings = get_settings()
+            self.available_extensions = [
+                ServerPerMessageDeflateFactory(
+                    server_no_context_takeover=not settings.ws_context_takeover,
+                    compress_settings={"level": settings.ws_compression_level, "memLevel": 5},
+                )
+            ]
+
+# Listening socket that other workers can bind too
+def reuse_port_socket(host: str, port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, port))
+    return sock
+
+class Server(uvicorn.Server):
+
+    # uvicorn closes every WebSocket at once before the lifespan shutdown
+    # runs; drain them first so clients get SERVICE_RESTART in batches
+    async def shutdown(self, sockets=None):
+        await drain_websockets(get_settings().ws_drain_seconds)
+        await super().shutdown(sockets)
+
+    # Entry point of each worker process. Workers bind their own socket rather
+    # than sharing the parent's, so accepts are balanced by the kernel instead
+    # of going to whichever worker wakes first.
+    def run_worker(self, sockets=None):
+        self.run(sockets=[reuse_port_socket(self.config.host, self.config.port)])
+
+# uvicorn's multiprocess supervisor, plus restarting workers that die. SIGTERM
+# still reaches every worker, and each drains its own WebSockets.
+class Supervisor(Multiprocess):
+
+    def run(self):
+        self.startup()
+        while not self.should_exit.wait(WORKER_CHECK_SECONDS):
+            for index, process in enumerate(self.processes):
+                if process.is_alive():
+                    continue
+                logger.warning("Worker %s exited with code %s, restarting", process.pid, process.exitcode)
+                process = get_subprocess(config=self.config, target=self.target, sockets=self.sockets)
+                process.start()
+                self.processes[index] = process
+        self.shutdown()
+
+def serve(host: str, port: int, workers: int):
+    config = uvicorn.Config("app.main:app", host=host, port=port, workers=workers, **uvicorn_options())
+    server = Server(config)
+    if workers <= 1:
+        server.run()
+        return
+
+    # Workers are spawned fresh and read their settings from the environment
+    metrics_dir = None
+    if not os.environ.get("METRICS_DIR"):
+        metrics_dir = os.environ["METRICS_DIR"] = tempfile.mkdtemp(prefix="hottakes-metrics-")
+    try:
+        Supervisor(config, target=server.run_worker, sockets=[]).run()
+    finally:
+        if metrics_dir:
+            shutil.rmtree(metrics_dir, ignore_errors=True)
+
+# Keyword arguments for uvicorn.Config shared by every way of serving the app
+def uvicorn_options() -> dict:
+    settings = get_settings()
+    return {
+        "ws": DeflateWebSocketProtocol,
+        "ws_per_message_deflate": settings.ws_compression,
+        "proxy_headers": True,
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the Hot Takes API")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=get_settings().web_concurrency)
+    args = parser.parse_args()
+
+    serve(args.host, args.port, args.workers)
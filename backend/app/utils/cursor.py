@@ -0,0 +1,101 @@
+import base64
+import binascii
+import hashlib
+import hmac
+import struct
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from functools import lru_cache
+from uuid import UUID
+
+from app.config import get_settings
+
+# Opaque pagination cursors for GET /takes and search.
+#
+# Layout (big-endian), then base64url without padding:
+#   version (1) | sort (1) | epoch micros (8) | take id (16) | [score (8)] | tag (8)
+#
+# For `newest` the timestamp is the last take's created_at. For hot sorts it is
+# the moment the first page was ranked, so later pages score takes against the
+# same clock, and the score is the last take's hot score. Search cursors carry
+# the last row's created_at and search rank, and /me pages the last row's
+# created_at (for likes, when it was liked). Moderation queue cursors carry the
+# last item's created_at and its report count or toxicity. The tag is a
+# truncated HMAC-SHA256 so clients can't hand-craft cursors.
+
+CURSOR_VERSION = 1
+SORT_CODES = {
+    "newest": 0, "hottest_24h": 1, "hottest_7d": 2, "search": 3, "search_comments": 4,
+    "me_takes": 5, "me_comments": 6, "me_likes": 7, "moderation_reports": 8, "moderation_toxicity": 9,
+}
+SORT_NAMES = {code: name for name, code in SORT_CODES.items()}
+SCORED_SORTS = {"hottest_24h", "hottest_7d", "search", "search_comments", "moderation_reports", "moderation_toxicity"}
+
+_HEADER = struct.Struct(">BBq")
+_SCORE = struct.Struct(">d")
+TAG_SIZE = 8
+
+EPOCH = datetime(1970, 1, 1)
+ONE_MICROSECOND = timedelta(microseconds=1)
+
+class InvalidCursor(ValueError):
+    pass
+
+@dataclass(slots=True)
+class Cursor:
+    sort: str
+    timestamp: datetime  # naive UTC, to match the DB
+    id: UUID
+    score: float | None = None
+
+@lru_cache
+def _signing_key() -> bytes:
+    return hashlib.sha256(b"cursor:" + get_settings().jwt_secret.encode()).digest()
+
+def _tag(payload: bytes) -> bytes:
+    return hmac.digest(_signing_key(), payload, "sha256")[:TAG_SIZE]
+
+def encode_cursor(cursor: Cursor) -> str:
+    micros = (cursor.timestamp - EPOCH) // ONE_MICROSECOND
+    payload = _HEADER.pack(CURSOR_VERSION, SORT_CODES[cursor.sort], micros) + cursor.id.bytes
+    if cursor.sort in SCORED_SORTS:
+        payload += _SCORE.pack(cursor.score)
+
+    return base64.urlsafe_b64encode(payload + _tag(payload)).rstrip(b"=").decode()
+
+# Decode and verify a cursor issued for `sort`. Raises InvalidCursor for
+# anything malformed, tampered with, from another version or another sort.
+def decode_cursor(token: str, sort: str) -> Cursor:
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+    except (binascii.Error, ValueError):
+        raise InvalidCursor("Cursor is not valid base64")
+
+    expected_size = _HEADER.size + 16 + TAG_SIZE
+    if sort in SCORED_SORTS:
+        expected_size += _SCORE.size
+    if len(raw) != expected_size:
+        raise InvalidCursor("Cursor has the wrong length")
+
+    payload, tag = raw[:-TAG_SIZE], raw[-TAG_SIZE:]
+    if not hmac.compare_digest(tag, _tag(payload)):
+        raise InvalidCursor("Cursor signature does not match")
+
+    version, sort_code, micros = _HEADER.unpack_from(payload)
+    if version != CURSOR_VERSION:
+        raise InvalidCursor("Unsupported cursor version")
+    if SORT_NAMES.get(sort_code) != sort:
+        raise InvalidCursor("Cursor belongs to a different sort")
+
+    offset = _HEADER.size
+    take_id = UUID(bytes=payload[offset:offset + 16])
+    score = None
+    if sort in SCORED_SORTS:
+        (score,) = _SCORE.unpack_from(payload, offset + 16)
+
+    return Cursor(
+        sort=sort,
+        timestamp=EPOCH + micros * ONE_MICROSECOND,
+        id=take_id,
+        score=score,
+    )
@@ -0,0 +1,90 @@
+import hashlib
+import logging
+import time
+from uuid import UUID
+
+import redis.asyncio as redis
+from fastapi import Request, Response
+
+from app.utils.redis_client import get_redis
+
+# Conditional GET support for the read endpoints.
+#
+# Every write bumps a feed-wide version counter in Redis (and a per-take one
+# for likes, comments and deletes). ETags are derived from those counters, so
+# a matching If-None-Match can be answered with a 304 after one Redis read,
+# before any SQL runs.
+
+logger = logging.getLogger(__name__)
+
+FEED_VERSION_KEY = "version:feed"
+
+# Hot rankings and the 24h/7d windows drift with time even without writes
+TIME_BUCKET_SECONDS = 60
+
+ANONYMOUS_CACHE_CONTROL = "public, max-age=0, s-maxage=10, stale-while-revalidate=30"
+PRIVATE_CACHE_CONTROL = "private, no-cache"
+
+def take_version_key(take_id: UUID) -> str:
+    return f"version:take:{take_id}"
+
+# Keys a write bumps: the feed version, and the version of each given take
+def version_keys(*take_ids: UUID) -> list[str]:
+    return [FEED_VERSION_KEY, *(take_version_key(take_id) for take_id in take_ids)]
+
+# Queue the version bumps for a write on a pipeline
+def add_version_bumps(pipe, *take_ids: UUID):
+    for key in version_keys(*take_ids):
+        pipe.incr(key)
+
+# Record a write made outside a request session (request handlers use
+# app.utils.outbox.queue_change so the bump waits for the commit)
+async def record_change(*take_ids: UUID):
+    redis_client = await get_redis()
+    async with redis_client.pipeline(transaction=False) as pipe:
+        add_version_bumps(pipe, *take_ids)
+        await pipe.execute()
+
+# Current versions for the given keys, or None if Redis can't be reached (in
+# which case callers skip conditional handling)
+async def get_versions(*keys: str) -> list[str] | None:
+    try:
+        redis_client = await get_redis()
+        values = await redis_client.mget(keys)
+    except redis.RedisError:
+        logger.warning("Could not read resource versions", exc_info=True)
+        return None
+    return parse_versions(values)
+
+# Versions from an MGET reply (unset keys are version 0)
+def parse_versions(values: list[str | None]) -> list[str]:
+    return [value or "0" for value in values]
+
+def time_bucket() -> int:
+    return int(time.time() // TIME_BUCKET_SECONDS)
+
+def make_etag(*parts) -> str:
+    digest = hashlib.blake2b("|".join(map(str, parts)).encode(), digest_size=12).hexdigest()
+    return f'W/"{digest}"'
+
+# Weak comparison of If-None-Match against `etag`
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in header.split(","))
+
+def cache_headers(etag: str | None, user_id: UUID | None) -> dict[str, str]:
+    headers = {
+        "Cache-Control": PRIVATE_CACHE_CONTROL if user_id else ANONYMOUS_CACHE_CONTROL,
+        "Vary": "Cookie",
+    }
+    if etag:
+        headers["ETag"] = etag
+    return headers
+
+def not_modified(etag: str, user_id: UUID | None) -> Response:
+    return Response(status_code=304, headers=cache_headers(etag, user_id))
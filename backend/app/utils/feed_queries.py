@@ -0,0 +1,152 @@
+from datetime import datetime
+from uuid import UUID
+
+from sqlalchemy import Float, select, func, cast, extract, literal, literal_column
+
+from app.models import User, Take, Like, Comment
+
+# SQL expression for a take's hot score: likes / (age_hours + 2) ^ gravity.
+# `now` is passed in (naive UTC, to match the DB) so it is one bound parameter.
+# Computed in double precision so a score read back into a cursor compares
+# exactly against the same expression on the next page.
+def hot_score(now: datetime):
+    age_hours = cast(extract("epoch", now - Take.created_at), Float) / 3600
+    gravity = 1.5
+    return Take.like_count / func.power(age_hours + 2, gravity)
+
+# Visible comments on the take in the enclosing query
+def comment_count_subquery():
+    return (
+        select(func.count(Comment.id))
+        .where(
+            Comment.take_id == Take.id,
+            Comment.take_created_at == Take.created_at,
+            Comment.is_hidden == False,
+        )
+        .correlate(Take)
+        .scalar_subquery()
+    )
+
+# Read paths select just the columns a take response needs. Rows come back as
+# plain named tuples: no identity map, no change tracking, no full User rows.
+# The comment count and the viewer's like are correlated subqueries (pinned to
+# takes, so callers can join likes or comments), so a whole page (or a single
+# take) is one round trip.
+def take_rows_query(user_id: UUID | None = None):
+    comment_count = comment_count_subquery()
+
+    if user_id:
+        user_liked = (
+            select(Like.id)
+            .where(
+                Like.take_id == Take.id,
+                Like.take_created_at == Take.created_at,
+                Like.user_id == user_id,
+            )
+            .correlate(Take)
+            .exists()
+        )
+    else:
+        user_liked = literal(False)
+
+    return (
+        select(
+            Take.id,
+            Take.content,
+            Take.like_count,
+            Take.created_at,
+            User.username,
+            comment_count.label("comment_count"),
+            user_liked.label("user_liked"),
+        )
+        .join(User, User.id == Take.user_id)
+        .where(Take.is_hidden == False)
+        .execution_options(query_name="take_rows")
+    )
+
+# One take, hidden or not, with what the take cache keeps
+def take_detail_query(take_id: UUID):
+    return (
+        select(
+            Take.id,
+            Take.user_id,
+            Take.content,
+            Take.like_count,
+            Take.created_at,
+            Take.is_hidden,
+            User.username,
+            comment_count_subquery().label("comment_count"),
+        )
+        .join(User, User.id == Take.user_id)
+        .where(Take.id == take_id)
+        .execution_options(query_name="take_detail")
+    )
+
+# Plain dict for a take row, in TakeResponse's shape. Read endpoints encode
+# these straight to JSON with orjson instead of building Pydantic models.
+def take_payload(row) -> dict:
+    return {
+        "id": row.id,
+        "content": row.content,
+        "like_count": row.like_count,
+        "comment_count": row.comment_count,
+        "created_at": row.created_at,
+        "username": row.username,
+        "user_liked": row.user_liked,
+    }
+
+# Plain dict for a comment row, in CommentResponse's shape
+def comment_payload(row) -> dict:
+    return {
+        "id": row.id,
+        "take_id": row.take_id,
+        "content": row.content,
+        "username": row.username,
+        "created_at": row.created_at,
+    }
+
+# Top `limit` takes since `cutoff` by engagement (likes + comments)
+def top_today_query(cutoff: datetime, user_id: UUID | None = None, limit: int = 3):
+    rows = take_rows_query(user_id).where(Take.created_at >= cutoff).subquery()
+    return (
+        select(rows)
+        .order_by((rows.c.like_count + rows.c.comment_count).desc(), rows.c.created_at.desc())
+        .limit(limit)
+        .execution_options(query_name="top_today")
+    )
+
+SEARCH_CONFIG = literal_column("'english'::regconfig")
+
+# Filter and rank for a search over `content` and its generated `vector`
+# column. Full-text matches use the tsvector GIN index; with `fuzzy`, a
+# trigram word-similarity match (GIN gin_trgm_ops index) also catches typos
+# and partial words. The rank is double precision for exact cursor compares.
+def search_match(vector, content, q: str, fuzzy: bool = True):
+    tsquery = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+    matches = vector.op("@@")(tsquery)
+    rank = func.ts_rank_cd(vector, tsquery)
+    if fuzzy:
+        matches = matches | literal(q).op("<%")(content)
+        rank = rank + func.word_similarity(q, content)
+    return matches, cast(rank, Float)
+
+# Visible takes matching `q`, with a `rank` column, best first
+def search_takes_query(q: str, user_id: UUID | None = None, fuzzy: bool = True):
+    matches, rank = search_match(Take.search_vector, Take.content, q, fuzzy)
+    return (
+        take_rows_query(user_id)
+        .add_columns(rank.label("rank"))
+        .where(matches)
+        .execution_options(query_name="search_takes")
+    ), rank
+
+# Visible comments on visible takes matching `q`, with a `rank` column
+def search_comments_query(q: str, fuzzy: bool = True):
+    matches, rank = search_match(Comment.search_vector, Comment.content, q, fuzzy)
+    return (
+        select(Comment.id, Comment.take_id, Comment.content, User.username, Comment.created_at, rank.label("rank"))
+        .join(User, User.id == Comment.user_id)
+        .join(Take, (Take.id == Comment.take_id) & (Take.created_at == Comment.take_created_at))
+        .where(matches, Comment.is_hidden == False, Take.is_hidden == False)
+        .execution_options(query_name="search_comments")
+    ), rank
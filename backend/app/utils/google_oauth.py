@@ -0,0 +1,120 @@
+import asyncio
+import re
+import time
+from typing import TYPE_CHECKING
+from fastapi import HTTPException
+from app.config import get_settings
+from app.utils.http_client import get_http_client
+
+if TYPE_CHECKING:
+    import jwt
+
+# Google sign-in: exchange the authorization code, then identify the user
+# either by verifying the returned id_token against Google's cached signing
+# keys (no extra round trip) or by calling the userinfo endpoint. PyJWT is
+# imported on first use, like httpx, to keep it out of startup.
+
+# Fallback JWKS lifetime when the response has no max-age
+DEFAULT_JWKS_MAX_AGE = 3600
+# Don't refetch the JWKS for unknown key ids more often than this
+JWKS_MIN_REFRESH_SECONDS = 60
+
+_jwks: dict[str, "jwt.PyJWK"] = {}
+_jwks_expires_at = 0.0
+_jwks_fetched_at = 0.0
+_jwks_lock = asyncio.Lock()
+
+async def _refresh_jwks():
+    global _jwks, _jwks_expires_at, _jwks_fetched_at
+    import jwt
+
+    response = await get_http_client().get(get_settings().google_jwks_url)
+    response.raise_for_status()
+
+    max_age = re.search(r"max-age=(\d+)", response.headers.get("cache-control", ""))
+    now = time.monotonic()
+    _jwks = {key["kid"]: jwt.PyJWK(key) for key in response.json()["keys"] if key.get("use", "sig") == "sig"}
+    _jwks_fetched_at = now
+    _jwks_expires_at = now + (int(max_age.group(1)) if max_age else DEFAULT_JWKS_MAX_AGE)
+
+async def _signing_key(kid: str) -> "jwt.PyJWK | None":
+    def stale() -> bool:
+        now = time.monotonic()
+        if now >= _jwks_expires_at:
+            return True
+        # Google rotated keys since we last fetched
+        return kid not in _jwks and now - _jwks_fetched_at >= JWKS_MIN_REFRESH_SECONDS
+
+    if stale():
+        async with _jwks_lock:
+            if stale():
+                await _refresh_jwks()
+    return _jwks.get(kid)
+
+# Verify a Google id_token and return its claims
+async def verify_id_token(id_token: str) -> dict:
+    import jwt
+
+    settings = get_settings()
+    try:
+        key = await _signing_key(jwt.get_unverified_header(id_token).get("kid", ""))
+        if key is None:
+            raise jwt.InvalidTokenError("Unknown signing key")
+        claims = jwt.decode(
+            id_token,
+            key.key,
+            algorithms=["RS256"],
+            audience=settings.google_client_id,
+            leeway=30,
+        )
+    except jwt.InvalidTokenError:
+        raise HTTPException(status_code=400, detail="Invalid id_token from Google")
+
+    issuers = {settings.google_issuer, settings.google_issuer.removeprefix("https://")}
+    if claims.get("iss") not in issuers:
+        raise HTTPException(status_code=400, detail="Invalid id_token from Google")
+    return claims
+
+# Exchange an authorization code and return (google_id, email)
+async def get_google_user(code: str) -> tuple[str, str]:
+    import httpx
+
+    settings = get_settings()
+    client = get_http_client()
+
+    try:
+        token_response = await client.post(
+            settings.google_token_url,
+            data={
+                "client_id": settings.google_client_id,
+                "client_secret": settings.google_client_secret,
+                "code": code,
+                "grant_type": "authorization_code",
+                "redirect_uri": settings.google_redirect_uri,
+            },
+        )
+        if token_response.status_code != 200:
+            raise HTTPException(status_code=400, detail="Failed to exchange code for token")
+        tokens = token_response.json()
+
+        if settings.google_verify_id_token and tokens.get("id_token"):
+            claims = await verify_id_token(tokens["id_token"])
+            # Only trust the email for account linking once Google has verified it
+            email = claims.get("email") if claims.get("email_verified") else None
+            google_id = claims.get("sub")
+        else:
+            userinfo_response = await client.get(
+                settings.google_userinfo_url,
+                headers={"Authorization": f"Bearer {tokens.get('access_token')}"},
+            )
+            if userinfo_response.status_code != 200:
+                raise HTTPException(status_code=400, detail="Failed to get user info from Google")
+            google_user = userinfo_response.json()
+            google_id = google_user.get("id")
+            email = google_user.get("email")
+    except httpx.HTTPError:
+        raise HTTPException(status_code=502, detail="Could not reach Google")
+
+    if not google_id or not email:
+        raise HTTPException(status_code=400, detail="Invalid user info from Google")
+    return google_id, email
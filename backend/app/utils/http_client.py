@@ -0,0 +1,35 @@
+from typing import TYPE_CHECKING
+from app.config import get_settings
+
+if TYPE_CHECKING:
+    import httpx
+
+# Shared outbound HTTP client (Google OAuth). Keep-alive and HTTP/2 let logins
+# reuse one connection instead of a TCP/TLS handshake per call. It's created
+# on first use so httpx stays out of startup, and closed by the lifespan.
+
+_client = None
+
+def get_http_client() -> "httpx.AsyncClient":
+    global _client
+    if _client is None:
+        import httpx
+
+        settings = get_settings()
+        _client = httpx.AsyncClient(
+            timeout=httpx.Timeout(settings.http_timeout_seconds, connect=settings.http_connect_timeout_seconds),
+            # Retries only cover failed connection attempts, so they're safe
+            # for the single-use OAuth code exchange
+            transport=httpx.AsyncHTTPTransport(
+                http2=True,
+                retries=settings.http_retries,
+                limits=httpx.Limits(max_connections=50, max_keepalive_connections=10, keepalive_expiry=60),
+            ),
+        )
+    return _client
+
+async def close_http_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -1,12 +1,16 @@
 from datetime import datetime, timedelta, timezone
 from uuid import UUID
-import jwt
 from app.config import get_settings
 
+# PyJWT pulls in cryptography, so it's imported on first use rather than at
+# startup
+
 ALGORITHM = "HS256"
 SESSION_EXPIRE_DAYS = 7
 
 def create_session_token(user_id: UUID) -> str:
+    import jwt
+
     settings = get_settings()
     expire = datetime.now(timezone.utc) + timedelta(days=SESSION_EXPIRE_DAYS)
     payload = {
@@ -17,6 +21,8 @@ def create_session_token(user_id: UUID) -> str:
     return jwt.encode(payload, settings.jwt_secret, algorithm=ALGORITHM)
 
 def verify_session_token(token: str) -> UUID | None:
+    import jwt
+
     settings = get_settings()
 
     try:
@@ -0,0 +1,79 @@
+import asyncio
+import hashlib
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Any
+
+from app.config import get_settings
+from app.utils.redis_client import get_redis
+
+# Top takes of the last 24 hours, precomputed in the background and kept in
+# Redis so GET /takes/top/today doesn't rank the whole day on every load.
+# Entries are stored without user_liked, which is per-viewer.
+
+logger = logging.getLogger(__name__)
+
+LEADERBOARD_KEY = "leaderboard:top_today"
+# Digest of the stored leaderboard, for the top-today ETag. It only changes
+# when the ranking does, and is written together with the leaderboard.
+LEADERBOARD_VERSION_KEY = "leaderboard:top_today:version"
+REFRESH_LOCK_KEY = "leaderboard:top_today:lock"
+
+# Recompute the leaderboard and store it. The stored copy expires after a few
+# missed refreshes so a dead refresher degrades to the SQL fallback rather than
+# serving a stale ranking forever.
+async def refresh_leaderboard() -> list[dict[str, Any]]:
+    # Imported here so the outbox (loaded by app.database) can use the keys
+    from app.database import async_session_maker
+    from app.utils.feed_queries import top_today_query
+
+    settings = get_settings()
+    cutoff = datetime.utcnow() - timedelta(hours=24)
+
+    async with async_session_maker() as db:
+        result = await db.execute(top_today_query(cutoff))
+        rows = result.all()
+
+    entries = [
+        {
+            "id": str(row.id),
+            "content": row.content,
+            "like_count": row.like_count,
+            "comment_count": row.comment_count,
+            "created_at": row.created_at.isoformat(),
+            "username": row.username,
+        }
+        for row in rows
+    ]
+
+    payload = json.dumps(entries)
+    expiry = settings.leaderboard_refresh_seconds * 3
+    redis_client = await get_redis()
+    async with redis_client.pipeline(transaction=True) as pipe:
+        pipe.set(LEADERBOARD_KEY, payload, ex=expiry)
+        pipe.set(LEADERBOARD_VERSION_KEY, hashlib.blake2b(payload.encode(), digest_size=8).hexdigest(), ex=expiry)
+        await pipe.execute()
+    return entries
+
+# Stored leaderboard from a GET reply, or None if it is cold
+def parse_leaderboard(raw: str | None) -> list[dict[str, Any]] | None:
+    if raw is None:
+        return None
+    return json.loads(raw)
+
+# Background task: refresh the leaderboard every few seconds. The lock makes
+# sure only one app instance does the work per interval.
+async def run_leaderboard_refresher():
+    interval = get_settings().leaderboard_refresh_seconds
+
+    while True:
+        try:
+            redis_client = await get_redis()
+            if await redis_client.set(REFRESH_LOCK_KEY, "1", nx=True, ex=interval):
+                await refresh_leaderboard()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Leaderboard refresh failed")
+        await asyncio.sleep(interval)
@@ -0,0 +1,104 @@
+from datetime import datetime
+from uuid import UUID, uuid4
+from sqlalchemy import delete, exists, func, literal, select, union_all, update
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID, insert
+from app.models import Take, Like
+
+# Single-statement like toggles for the batch endpoint. Data-modifying CTEs
+# insert the new likes, delete the removed ones and adjust like_count on the
+# affected takes, all in one round trip. Every CTE sees the same snapshot, so
+# the same take must not appear in both lists (the request schema checks).
+
+def toggle_likes_statement(user_id: UUID, like_ids: list[UUID], unlike_ids: list[UUID]):
+    user = literal(user_id, PG_UUID(as_uuid=True))
+
+    targets = (
+        select(Take.id, Take.created_at)
+        .where(Take.id.in_(like_ids), Take.is_hidden == False)
+        .cte("targets")
+    )
+    inserted = (
+        insert(Like.__table__)
+        .from_select(
+            ["id", "take_id", "take_created_at", "user_id"],
+            select(func.gen_random_uuid(), targets.c.id, targets.c.created_at, user),
+        )
+        .on_conflict_do_nothing(index_elements=["take_id", "take_created_at", "user_id"])
+        .returning(Like.take_id, Like.take_created_at)
+        .cte("inserted")
+    )
+    deleted = (
+        delete(Like.__table__)
+        .where(
+            Like.user_id == user_id,
+            Like.take_id.in_(unlike_ids),
+            Like.take_id == Take.id,
+            Like.take_created_at == Take.created_at,
+            Take.is_hidden == False,
+        )
+        .returning(Like.take_id, Like.take_created_at)
+        .cte("deleted")
+    )
+
+    changes = union_all(
+        select(inserted.c.take_id, inserted.c.take_created_at, literal(1).label("delta")),
+        select(deleted.c.take_id, deleted.c.take_created_at, literal(-1).label("delta")),
+    ).subquery("changes")
+    per_take = (
+        select(changes.c.take_id, changes.c.take_created_at, func.sum(changes.c.delta).label("delta"))
+        .group_by(changes.c.take_id, changes.c.take_created_at)
+        .subquery("per_take")
+    )
+
+    return (
+        update(Take)
+        .where(Take.id == per_take.c.take_id, Take.created_at == per_take.c.take_created_at)
+        .values(like_count=func.greatest(0, Take.like_count + per_take.c.delta))
+        .returning(Take.id, Take.like_count)
+        .execution_options(query_name="toggle_likes", synchronize_session=False)
+    )
+
+# Which of `take_ids` the user has liked. Likes are joined through the takes so
+# each lookup carries (take_id, take_created_at) and only probes that take's
+# likes partition.
+def liked_ids_query(user_id: UUID, take_ids: list[UUID]):
+    return (
+        select(Like.take_id)
+        .join(Take, (Like.take_id == Take.id) & (Like.take_created_at == Take.created_at))
+        .where(Take.id.in_(take_ids), Like.user_id == user_id)
+        .execution_options(query_name="liked_ids")
+    )
+
+# Single-take like and unlike for a take already looked up (its created_at
+# pins the partition). Each returns the like's id, or nothing if there was no
+# change.
+def add_like_statement(user_id: UUID, take_id: UUID, take_created_at: datetime):
+    return (
+        insert(Like.__table__)
+        .values(id=uuid4(), take_id=take_id, take_created_at=take_created_at, user_id=user_id)
+        .on_conflict_do_nothing(index_elements=["take_id", "take_created_at", "user_id"])
+        .returning(Like.id)
+    )
+
+def remove_like_statement(user_id: UUID, take_id: UUID, take_created_at: datetime):
+    return (
+        delete(Like.__table__)
+        .where(Like.take_id == take_id, Like.take_created_at == take_created_at, Like.user_id == user_id)
+        .returning(Like.id)
+    )
+
+# Add `delta` to a take's like_count, never going below zero. Returns the new
+# count.
+def adjust_like_count_statement(take_id: UUID, take_created_at: datetime, delta: int):
+    return (
+        update(Take)
+        .where(Take.id == take_id, Take.created_at == take_created_at)
+        .values(like_count=func.greatest(0, Take.like_count + delta))
+        .returning(Take.like_count)
+        .execution_options(query_name="adjust_like_count", synchronize_session=False)
+    )
+
+def user_liked_query(user_id: UUID, take_id: UUID, take_created_at: datetime):
+    return select(
+        exists().where(Like.take_id == take_id, Like.take_created_at == take_created_at, Like.user_id == user_id)
+    )
@@ -0,0 +1,252 @@
+import json
+import os
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from pathlib import Path
+
+from sqlalchemy import event
+from starlette.routing import Match
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+# In-process latency metrics, rendered in Prometheus text format on /metrics.
+#
+# Each labelled series is a flat list of bucket counts allocated the first
+# time that label combination is seen, so recording an observation is a
+# bisect and two increments. Round trips per request are tallied in a small
+# per-request list held in a ContextVar.
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 4, 5, 6, 8, 10, 15, 20, 50)
+
+REGISTRY: list["Histogram | Counter"] = []
+
+class Histogram:
+    __slots__ = ("name", "help", "label_names", "buckets", "series")
+
+    def __init__(self, name: str, help: str, label_names: tuple[str, ...] = (), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.label_names = label_names
+        self.buckets = buckets
+        # labels -> [count per bucket..., count above last bucket, sum]
+        self.series: dict[tuple, list] = {}
+        REGISTRY.append(self)
+
+    def observe(self, value: float, *labels: str):
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def render(self, series_by_labels: dict | None = None) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, series in (self.series if series_by_labels is None else series_by_labels).items():
+            base = _format_labels(self.label_names, labels)
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{base}{"," if base else ""}le="{bound}"}} {cumulative}')
+            cumulative += series[-2]
+            lines.append(f'{self.name}_bucket{{{base}{"," if base else ""}le="+Inf"}} {cumulative}')
+            lines.append(f"{_series(self.name + '_sum', base)} {series[-1]}")
+            lines.append(f"{_series(self.name + '_count', base)} {cumulative}")
+        return lines
+
+class Counter:
+    __slots__ = ("name", "help", "label_names", "series")
+
+    def __init__(self, name: str, help: str, label_names: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = label_names
+        self.series: dict[tuple, float] = {}
+        REGISTRY.append(self)
+
+    def inc(self, *labels: str, amount: float = 1):
+        self.series[labels] = self.series.get(labels, 0) + amount
+
+    def render(self, series_by_labels: dict | None = None) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, value in (self.series if series_by_labels is None else series_by_labels).items():
+            lines.append(f"{_series(self.name, _format_labels(self.label_names, labels))} {value}")
+        return lines
+
+def _format_labels(names: tuple[str, ...], values: tuple) -> str:
+    return ",".join(f'{name}="{value}"' for name, value in zip(names, values))
+
+def _series(name: str, labels: str) -> str:
+    return f"{name}{{{labels}}}" if labels else name
+
+# Multi-worker mode: each worker writes its series to <directory>/<pid>.json,
+# and /metrics renders the sum over every file, so a scrape covers the whole
+# server whichever worker answers it. Files of workers that died are kept, so
+# counters never go backwards.
+def dump_metrics(directory: str):
+    snapshot = {
+        metric.name: [[list(labels), value] for labels, value in metric.series.items()]
+        for metric in REGISTRY
+    }
+    path = Path(directory) / f"{os.getpid()}.json"
+    temporary = path.with_suffix(".tmp")
+    temporary.write_text(json.dumps(snapshot))
+    temporary.replace(path)
+
+def _merged_series(directory: str) -> dict[str, dict[tuple, float | list]]:
+    merged: dict[str, dict[tuple, float | list]] = {}
+    for path in Path(directory).glob("*.json"):
+        try:
+            snapshot = json.loads(path.read_text())
+        except (OSError, ValueError):
+            continue
+        for name, series in snapshot.items():
+            totals = merged.setdefault(name, {})
+            for labels, value in series:
+                labels = tuple(labels)
+                current = totals.get(labels)
+                if current is None:
+                    totals[labels] = value
+                elif isinstance(value, list):
+                    totals[labels] = [a + b for a, b in zip(current, value)]
+                else:
+                    totals[labels] = current + value
+    return merged
+
+def render_metrics(directory: str = "") -> str:
+    merged = None
+    if directory:
+        dump_metrics(directory)
+        merged = _merged_series(directory)
+
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render(None if merged is None else merged.get(metric.name, {})))
+    return "\n".join(lines) + "\n"
+
+http_requests = Counter(
+    "http_requests_total", "HTTP requests handled", ("method", "route", "status"),
+)
+http_request_duration = Histogram(
+    "http_request_duration_seconds", "HTTP request latency", ("method", "route"),
+)
+db_query_duration = Histogram(
+    "db_query_duration_seconds", "Database statement latency", ("query",),
+)
+db_pool_wait = Histogram(
+    "db_pool_wait_seconds", "Time spent waiting for a pooled database connection",
+)
+db_round_trips = Histogram(
+    "db_round_trips_per_request", "Database statements per HTTP request", ("route",), COUNT_BUCKETS,
+)
+redis_command_duration = Histogram(
+    "redis_command_duration_seconds", "Redis command latency", ("command",),
+)
+redis_pipeline_commands = Histogram(
+    "redis_pipeline_commands", "Commands sent per Redis pipeline", (), COUNT_BUCKETS,
+)
+redis_round_trips = Histogram(
+    "redis_round_trips_per_request", "Redis round trips per HTTP request", ("route",), COUNT_BUCKETS,
+)
+ws_broadcast_duration = Histogram(
+    "ws_broadcast_duration_seconds", "Time to fan a message out to all sockets", ("channel",),
+)
+ws_messages_sent = Counter(
+    "ws_messages_sent_total", "WebSocket messages delivered", ("channel",),
+)
+
+# [db statements, redis round trips] for the request being handled
+DB_TRIPS = 0
+REDIS_TRIPS = 1
+_request_trips: ContextVar[list[int] | None] = ContextVar("request_trips", default=None)
+
+def count_round_trip(kind: int):
+    trips = _request_trips.get()
+    if trips is not None:
+        trips[kind] += 1
+
+# Route template for a request. FastAPI's APIRoutes record themselves in the
+# scope; plain Starlette routes (/openapi.json, /docs) don't, so those are
+# matched here. Only requests no route matches count as "unmatched".
+def route_template(scope) -> str:
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+
+    app = scope.get("app")
+    partial = None
+    for candidate in getattr(getattr(app, "router", None), "routes", ()):
+        match, _ = candidate.matches(scope)
+        if match == Match.FULL:
+            return candidate.path
+        if match == Match.PARTIAL and partial is None:
+            partial = candidate.path
+    return partial or "unmatched"
+
+# ASGI middleware timing every HTTP request by method and route template
+class MetricsMiddleware:
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        trips = [0, 0]
+        token = _request_trips.set(trips)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            _request_trips.reset(token)
+
+            route_path = route_template(scope)
+            method = scope["method"]
+            http_request_duration.observe(elapsed, method, route_path)
+            http_requests.inc(method, route_path, str(status))
+            db_round_trips.observe(trips[DB_TRIPS], route_path)
+            redis_round_trips.observe(trips[REDIS_TRIPS], route_path)
+
+# Hook statement timing into a SQLAlchemy engine. Queries are labelled by their
+# `query_name` execution option when set, otherwise by SQL verb.
+def instrument_engine(sync_engine):
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        name = context.execution_options.get("query_name") if context else None
+        if name is None:
+            name = statement.lstrip().split(None, 1)[0].lower()
+        db_query_duration.observe(elapsed, name)
+        count_round_trip(DB_TRIPS)
+
+    # A failed statement never reaches _after; drop its start time here
+    @event.listens_for(sync_engine, "handle_error")
+    def _error(context):
+        starts = context.connection.info.get("query_start") if context.connection else None
+        if starts:
+            starts.pop()
+
+# Pool that times every checkout. Sessions check out lazily on their first
+# statement, so requests that never query don't hold (or count) a connection.
+class TimedPool(AsyncAdaptedQueuePool):
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            db_pool_wait.observe(time.perf_counter() - start)
@@ -0,0 +1,87 @@
+from uuid import UUID
+
+from sqlalchemy import func, literal_column, select, tuple_, union_all, update
+
+from app.models import Take, Comment, User
+from app.utils.cursor import Cursor
+
+# The moderation queue is every flagged take and comment, most reported (or
+# most toxic) first, newest first on ties. Each table contributes at most one
+# page from its partial index on flagged rows, walked from the cursor, and the
+# two pages are merged, so a page costs two short index scans no matter how
+# many rows either table holds.
+
+QUEUE_SORTS = {"reports": "moderation_reports", "toxicity": "moderation_toxicity"}
+TARGET_MODELS = {"take": Take, "comment": Comment}
+
+# Must match the ix_*_flagged_toxicity index expression
+def toxicity(model):
+    return func.coalesce(model.toxicity_score, literal_column("0"))
+
+def queue_score(model, sort: str):
+    return model.report_count if sort == "reports" else toxicity(model)
+
+def _queue_page(target_type: str, sort: str, page: Cursor | None, limit: int):
+    model = TARGET_MODELS[target_type]
+    score = queue_score(model, sort)
+    take_id = Take.id if model is Take else Comment.take_id
+    query = (
+        select(
+            literal_column(f"'{target_type}'").label("target_type"),
+            model.id,
+            take_id.label("take_id"),
+            model.content,
+            User.username,
+            model.created_at,
+            model.report_count,
+            model.toxicity_score,
+            model.is_hidden,
+            score.label("score"),
+        )
+        .join(User, User.id == model.user_id)
+        .where(model.is_flagged == True)
+    )
+    if page:
+        last_score = int(page.score) if sort == "reports" else page.score
+        query = query.where(
+            tuple_(score, model.created_at, model.id) < tuple_(last_score, page.timestamp, page.id)
+        )
+    return query.order_by(score.desc(), model.created_at.desc(), model.id.desc()).limit(limit)
+
+# One page of the queue (plus one row, to tell whether there's another),
+# optionally for a single target type
+def moderation_queue_query(sort: str, page: Cursor | None, limit: int, target_type: str | None = None):
+    target_types = [target_type] if target_type else list(TARGET_MODELS)
+    pages = [select(_queue_page(name, sort, page, limit + 1).subquery()) for name in target_types]
+    merged = (pages[0] if len(pages) == 1 else union_all(*pages)).subquery("queue")
+    return (
+        select(merged)
+        .order_by(merged.c.score.desc(), merged.c.created_at.desc(), merged.c.id.desc())
+        .limit(limit + 1)
+        .execution_options(query_name="moderation_queue")
+    )
+
+# Hide or unhide `ids` and take them out of the queue. Returns each row's id
+# and whether it was hidden before (plus take_id for comments); the rows are
+# locked first so that's the state this update replaced.
+def moderate_statement(target_type: str, ids: list[UUID], hide: bool):
+    model = TARGET_MODELS[target_type]
+    # Joining on the partition key as well lets the update go straight to
+    # each row's partition
+    partition_key = Take.created_at if model is Take else Comment.take_created_at
+    locked = (
+        select(model.id, partition_key.label("partition_key"), model.is_hidden.label("was_hidden"))
+        .where(model.id.in_(ids))
+        .with_for_update()
+        .subquery("locked")
+    )
+    returning = [model.id, locked.c.was_hidden]
+    if model is Comment:
+        returning.append(Comment.take_id)
+    return (
+        update(model)
+        .where(model.id == locked.c.id, partition_key == locked.c.partition_key)
+        .values(is_hidden=hide, is_flagged=False)
+        .returning(*returning)
+        .execution_options(query_name=f"moderate_{target_type}s", synchronize_session=False)
+    )
@@ -0,0 +1,156 @@
+import asyncio
+import json
+import logging
+from dataclasses import dataclass, field
+from typing import Any
+from uuid import UUID
+
+import redis.asyncio as redis
+from sqlalchemy import ARRAY, Text, bindparam, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.config import get_settings
+from app.utils.etag import add_version_bumps, version_keys
+from app.utils.leaderboard import LEADERBOARD_KEY, LEADERBOARD_VERSION_KEY
+from app.utils.redis_client import get_redis
+
+# Per-request event outbox.
+#
+# Write handlers queue their pub/sub events and ETag version bumps on the
+# session instead of talking to Redis mid-transaction. get_db sends them in a
+# single pipeline after the commit (by which point the connection is back in
+# the pool), and drops them if the transaction rolls back, so clients never
+# hear about writes that didn't happen.
+#
+# Delivery after the commit is best effort. With transactional_outbox enabled
+# the events are also written to event_outbox inside the transaction and the
+# relay worker publishes them instead, so an event survives a Redis outage or
+# a crash between commit and publish (at the cost of up to one relay interval
+# of latency, and possible duplicates if the relay dies mid-batch). The
+# version bumps are stored too, as a row of keys with no channel: they're
+# still sent right after the commit so ETags change at once, and the relay
+# sends them again, so a lost bump can't keep serving 304s for stale content.
+# A repeated INCR only costs clients one extra full response.
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_KEY = "outbox"
+
+INSERT_EVENTS = text(
+    "INSERT INTO event_outbox (channel, payload, version_keys) VALUES (:channel, :payload, :version_keys)"
+).bindparams(bindparam("version_keys", type_=ARRAY(Text)))
+
+# Claim the oldest events, skipping rows another relay has locked
+CLAIM_EVENTS = text("""
+    DELETE FROM event_outbox
+    WHERE id IN (
+        SELECT id FROM event_outbox
+        ORDER BY id
+        LIMIT :batch_size
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING id, channel, payload, version_keys
+""")
+
+@dataclass(slots=True)
+class Outbox:
+    messages: list[tuple[str, str]] = field(default_factory=list)
+    changed: bool = False
+    take_ids: set[UUID] = field(default_factory=set)
+    reset_leaderboard: bool = False
+
+def _outbox(db: AsyncSession) -> Outbox:
+    return db.info.setdefault(OUTBOX_KEY, Outbox())
+
+# Publish `message` on `channel` once the request's transaction commits
+def queue_event(db: AsyncSession, channel: str, message: dict[str, Any]):
+    _outbox(db).messages.append((channel, json.dumps(message)))
+
+# Bump the feed version, and each given take's, once the transaction commits
+def queue_change(db: AsyncSession, *take_ids: UUID):
+    outbox = _outbox(db)
+    outbox.changed = True
+    outbox.take_ids.update(take_ids)
+
+# Drop the stored top-today leaderboard once the transaction commits, for
+# writes that hide or unhide takes. Requests rank in SQL until the refresher
+# stores a new one, so a hidden take never lingers for a whole refresh.
+def queue_leaderboard_reset(db: AsyncSession):
+    _outbox(db).reset_leaderboard = True
+
+# Called just before commit: persist queued version bumps and events in the
+# same transaction when the transactional outbox is on
+async def write_outbox(db: AsyncSession):
+    outbox = db.info.get(OUTBOX_KEY)
+    if not outbox or not get_settings().transactional_outbox:
+        return
+
+    rows = []
+    # Bumps first, so the relay changes versions before clients hear the event
+    if outbox.changed:
+        rows.append({"channel": None, "payload": None, "version_keys": version_keys(*outbox.take_ids)})
+    rows.extend(
+        {"channel": channel, "payload": payload, "version_keys": []} for channel, payload in outbox.messages
+    )
+    if rows:
+        await db.execute(INSERT_EVENTS, rows)
+
+def discard_outbox(db: AsyncSession):
+    db.info.pop(OUTBOX_KEY, None)
+
+# Called after commit: send every queued version bump and event in one round
+# trip. The write has already happened, so failures are logged, not raised.
+async def flush_outbox(db: AsyncSession):
+    outbox = db.info.pop(OUTBOX_KEY, None)
+    if not outbox:
+        return
+    messages = [] if get_settings().transactional_outbox else outbox.messages
+    if not outbox.changed and not messages and not outbox.reset_leaderboard:
+        return
+
+    try:
+        redis_client = await get_redis()
+        async with redis_client.pipeline(transaction=False) as pipe:
+            if outbox.changed:
+                add_version_bumps(pipe, *outbox.take_ids)
+            if outbox.reset_leaderboard:
+                pipe.delete(LEADERBOARD_KEY, LEADERBOARD_VERSION_KEY)
+            for channel, payload in messages:
+                pipe.publish(channel, payload)
+            await pipe.execute()
+    except redis.RedisError:
+        logger.warning("Could not flush %d outbox events", len(messages), exc_info=True)
+
+# Send up to `batch_size` stored bumps and events in one pipeline. The rows are
+# deleted in the same transaction, so a failed publish leaves them for the
+# next pass. Returns the number of events relayed.
+async def relay_outbox(engine: AsyncEngine, batch_size: int) -> int:
+    async with engine.begin() as conn:
+        rows = (await conn.execute(CLAIM_EVENTS, {"batch_size": batch_size})).all()
+        if rows:
+            redis_client = await get_redis()
+            async with redis_client.pipeline(transaction=False) as pipe:
+                for row in sorted(rows, key=lambda row: row.id):
+                    for key in row.version_keys:
+                        pipe.incr(key)
+                    if row.channel is not None:
+                        pipe.publish(row.channel, row.payload)
+                await pipe.execute()
+    return len(rows)
+
+# Background worker for the transactional outbox. Safe to run in every
+# instance: SKIP LOCKED keeps relays from claiming the same rows.
+async def run_outbox_relay(engine: AsyncEngine):
+    settings = get_settings()
+
+    while True:
+        try:
+            relayed = await relay_outbox(engine, settings.outbox_relay_batch_size)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Outbox relay failed")
+            relayed = 0
+        # Keep going straight away while there's a backlog
+        if relayed < settings.outbox_relay_batch_size:
+            await asyncio.sleep(settings.outbox_relay_interval_seconds)
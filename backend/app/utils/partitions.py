@@ -0,0 +1,257 @@
+import argparse
+import asyncio
+import json
+import logging
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import Select, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.config import get_settings
+from app.models import Take
+from app.utils.feed_queries import hot_score, take_rows_query, top_today_query
+
+# Monthly range partitions for takes, likes and comments.
+#
+# Takes are partitioned on created_at. Likes and comments are partitioned on
+# their take's created_at so everything belonging to a take sits in the same
+# month, which lets a whole month be detached and archived in one go.
+#
+#   python -m app.utils.partitions ensure            # pre-create future months
+#   python -m app.utils.partitions detach 2025-09    # detach months before Sept 2025
+#   python -m app.utils.partitions check             # verify feed queries prune
+
+logger = logging.getLogger(__name__)
+
+PARTITION_KEYS = {
+    "takes": "created_at",
+    "likes": "take_created_at",
+    "comments": "take_created_at",
+}
+
+# Children first, so detaching never trips the likes/comments -> takes foreign keys
+DETACH_ORDER = ["likes", "comments", "takes"]
+
+# Arbitrary constant so concurrent app instances don't race on DDL
+ADVISORY_LOCK_KEY = 726_001
+
+MAINTENANCE_INTERVAL_SECONDS = 6 * 60 * 60
+
+def add_months(month: date, n: int) -> date:
+    index = month.year * 12 + month.month - 1 + n
+    return date(index // 12, index % 12 + 1, 1)
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month:%Y_%m}"
+
+# Create this month's partitions plus `months_ahead` future ones. Returns the
+# names of partitions that did not exist yet.
+async def ensure_partitions(
+    conn: AsyncConnection,
+    months_ahead: int | None = None,
+    today: date | None = None,
+) -> list[str]:
+    if months_ahead is None:
+        months_ahead = get_settings().partition_months_ahead
+    current = (today or datetime.utcnow().date()).replace(day=1)
+
+    await conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": ADVISORY_LOCK_KEY})
+    existing = await _existing_partitions(conn)
+
+    created = []
+    for offset in range(months_ahead + 1):
+        month = add_months(current, offset)
+        missing = [table for table in PARTITION_KEYS if partition_name(table, month) not in existing]
+        if missing:
+            await _create_month(conn, month, missing)
+            created.extend(partition_name(table, month) for table in missing)
+    return created
+
+# Create `month`'s partitions for `tables`. Postgres refuses to create a
+# partition while the default partition holds rows in its range (say the app
+# ran past a month end with maintenance down), so those rows are set aside
+# first and written back once the partition exists. Deleting a take cascades
+# to its likes and comments, so moving takes means moving those too.
+async def _create_month(conn: AsyncConnection, month: date, tables: list[str]):
+    start, end = month.isoformat(), add_months(month, 1).isoformat()
+
+    def in_month(table: str) -> str:
+        key = PARTITION_KEYS[table]
+        return f"{key} >= '{start}' AND {key} < '{end}'"
+
+    stranded = []
+    for table in tables:
+        result = await conn.execute(text(
+            f"SELECT EXISTS (SELECT 1 FROM {table}_default WHERE {in_month(table)})"
+        ))
+        if result.scalar_one():
+            stranded.append(table)
+    moving = list(PARTITION_KEYS) if "takes" in stranded else stranded
+
+    for table in moving:
+        await conn.execute(text(
+            f"CREATE TEMP TABLE {table}_moving ON COMMIT DROP AS "
+            f"SELECT * FROM {table} WHERE {in_month(table)}"
+        ))
+    for table in reversed(moving):
+        await conn.execute(text(f"DELETE FROM {table} WHERE {in_month(table)}"))
+
+    for table in tables:
+        await conn.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {partition_name(table, month)} PARTITION OF {table} "
+            f"FOR VALUES FROM ('{start}') TO ('{end}')"
+        ))
+
+    # PARTITION_KEYS lists takes first, so likes and comments find their take
+    for table in moving:
+        columns = ", ".join(await _writable_columns(conn, table))
+        await conn.execute(text(
+            f"INSERT INTO {table} ({columns}) SELECT {columns} FROM {table}_moving"
+        ))
+        await conn.execute(text(f"DROP TABLE {table}_moving"))
+        logger.info("Moved %s rows for %s out of %s_default", table, month, table)
+
+# Detach every monthly partition that ends on or before `before`. The detached
+# tables are left in place to be dumped and dropped separately.
+async def detach_partitions(conn: AsyncConnection, before: date) -> list[str]:
+    before = before.replace(day=1)
+    await conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": ADVISORY_LOCK_KEY})
+    existing = await _existing_partitions(conn)
+
+    detached = []
+    for table in DETACH_ORDER:
+        prefix = f"{table}_p"
+        for name in sorted(existing):
+            if not name.startswith(prefix):
+                continue
+            month = datetime.strptime(name[len(prefix):], "%Y_%m").date()
+            if month < before:
+                await conn.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+                detached.append(name)
+    return detached
+
+# The time-windowed feed queries, as the app builds them, with their cutoffs
+def pruning_queries(now: datetime) -> dict[str, tuple[datetime, Select]]:
+    queries = {}
+    for label, window in (("hottest_24h", timedelta(hours=24)), ("hottest_7d", timedelta(days=7))):
+        score = hot_score(now)
+        query = (
+            take_rows_query()
+            .where(Take.created_at >= now - window)
+            .add_columns(score.label("score"))
+            .order_by(score.desc(), Take.id.desc())
+            .limit(21)  # first page at the default page size
+        )
+        queries[label] = (now - window, query)
+    cutoff = now - timedelta(hours=24)
+    queries["top_today"] = (cutoff, top_today_query(cutoff))
+    return queries
+
+# EXPLAIN the time-windowed feed queries and return, per query, the takes
+# partitions the planner still scans. With pruning working only the last month
+# or two (plus the default partition) should show up. The like and comment
+# subqueries are correlated on the take, so they prune per row at run time and
+# aren't checked here.
+async def check_pruning(conn: AsyncConnection, now: datetime | None = None) -> dict[str, list[str]]:
+    now = now or datetime.utcnow()
+    scanned = {}
+    for label, (_, query) in pruning_queries(now).items():
+        sql = query.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+        result = await conn.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"))
+        plan = result.scalar_one()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        relations = _relation_names(plan[0]["Plan"])
+        scanned[label] = sorted(name for name in relations if name.startswith("takes_"))
+    return scanned
+
+def expected_partitions(cutoff: datetime, today: date) -> set[str]:
+    month = cutoff.date().replace(day=1)
+    expected = {"takes_default"}
+    while month <= today:
+        expected.add(partition_name("takes", month))
+        month = add_months(month, 1)
+    return expected
+
+# Columns an INSERT can set (generated search vectors are recomputed)
+async def _writable_columns(conn: AsyncConnection, table: str) -> list[str]:
+    result = await conn.execute(text(
+        "SELECT column_name FROM information_schema.columns "
+        "WHERE table_name = :table AND table_schema = current_schema() AND is_generated = 'NEVER' "
+        "ORDER BY ordinal_position"
+    ), {"table": table})
+    return list(result.scalars())
+
+async def _existing_partitions(conn: AsyncConnection) -> set[str]:
+    result = await conn.execute(text(
+        "SELECT child.relname FROM pg_inherits "
+        "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "WHERE parent.relname = ANY(:tables)"
+    ), {"tables": list(PARTITION_KEYS)})
+    return {row[0] for row in result}
+
+def _relation_names(node: dict) -> set[str]:
+    names = set()
+    if "Relation Name" in node:
+        names.add(node["Relation Name"])
+    for child in node.get("Plans", []):
+        names |= _relation_names(child)
+    return names
+
+# Background task: keep future partitions in place while the app runs
+async def maintain_partitions(interval: float = MAINTENANCE_INTERVAL_SECONDS):
+    from app.database import engine
+
+    while True:
+        try:
+            async with engine.begin() as conn:
+                created = await ensure_partitions(conn)
+            if created:
+                logger.info("Created partitions: %s", ", ".join(created))
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Partition maintenance failed")
+        await asyncio.sleep(interval)
+
+async def _main(args: argparse.Namespace) -> int:
+    from app.database import engine
+
+    try:
+        async with engine.begin() as conn:
+            if args.command == "ensure":
+                created = await ensure_partitions(conn, args.months_ahead)
+                print("\n".join(created) or "Partitions already up to date")
+            elif args.command == "detach":
+                before = datetime.strptime(args.before, "%Y-%m").date()
+                detached = await detach_partitions(conn, before)
+                print("\n".join(detached) or "Nothing to detach")
+            elif args.command == "check":
+                now = datetime.utcnow()
+                cutoffs = {label: cutoff for label, (cutoff, _) in pruning_queries(now).items()}
+                failed = False
+                for label, partitions in (await check_pruning(conn, now)).items():
+                    extra = set(partitions) - expected_partitions(cutoffs[label], now.date())
+                    status = "FAIL" if extra else "ok"
+                    failed = failed or bool(extra)
+                    print(f"{status:4} {label}: {', '.join(partitions)}")
+                return 1 if failed else 0
+    finally:
+        await engine.dispose()
+    return 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage monthly table partitions")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    ensure_parser = subparsers.add_parser("ensure", help="Create current and future partitions")
+    ensure_parser.add_argument("--months-ahead", type=int, default=None)
+
+    detach_parser = subparsers.add_parser("detach", help="Detach partitions older than a month")
+    detach_parser.add_argument("before", help="First month to keep, as YYYY-MM")
+
+    subparsers.add_parser("check", help="Check feed queries only scan recent partitions")
+
+    raise SystemExit(asyncio.run(_main(parser.parse_args())))
@@ -1,7 +1,9 @@
-import bcrypt
+# bcrypt is imported on first use to keep it out of startup
 
 def hash_password(password: str) -> str:
+    import bcrypt
     return bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
 
 def verify_password(password: str, hashed: str) -> bool:
+    import bcrypt
     return bcrypt.checkpw(password.encode(), hashed.encode())
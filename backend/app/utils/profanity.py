@@ -1,6 +1,14 @@
-from better_profanity import profanity
+_profanity = None
 
-profanity.load_censor_words()
+# Import better_profanity and build its word list once. Called from the
+# lifespan; contains_profanity falls back to loading it on first use.
+def load_profanity():
+    global _profanity
+    if _profanity is None:
+        from better_profanity import profanity
+        profanity.load_censor_words()
+        _profanity = profanity
+    return _profanity
 
 def contains_profanity(text: str) -> bool:
-    return profanity.contains_profanity(text)
+    return load_profanity().contains_profanity(text)
@@ -0,0 +1,119 @@
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from functools import wraps
+
+from app.config import get_settings
+
+# Opt-in wall-clock stack sampling for hot code paths.
+#
+# Functions decorated with @profiled("name") can be sampled at runtime: a
+# fraction of their calls register their frame, and while any sampled call is
+# in flight a background thread snapshots the event loop thread's stack every
+# few milliseconds. Stacks passing through a sampled call's frame are counted
+# under that target, in the collapsed "frame;frame;frame count" format that
+# flamegraph.pl and speedscope read.
+#
+# With `profiling_enabled` off (the default) the decorator returns the function
+# untouched, so there is no overhead at all.
+
+class StackSampler:
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        # target name -> sample rate (0..1)
+        self.sample_rates: dict[str, float] = {}
+        # id(frame) of sampled calls in flight -> target name
+        self.active_frames: dict[int, str] = {}
+        self.stacks: dict[str, Counter] = {}
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._loop_thread_id: int | None = None
+
+    def should_sample(self, target: str) -> bool:
+        rate = self.sample_rates.get(target)
+        return bool(rate) and random.random() < rate
+
+    def begin(self, frame, target: str):
+        self._loop_thread_id = threading.get_ident()
+        self.active_frames[id(frame)] = target
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+                self._thread.start()
+
+    def end(self, frame):
+        self.active_frames.pop(id(frame), None)
+
+    def collapsed(self, target: str) -> str:
+        with self._lock:
+            stacks = dict(self.stacks.get(target, {}))
+        return "".join(f"{stack} {count}\n" for stack, count in sorted(stacks.items()))
+
+    def sample_counts(self) -> dict[str, int]:
+        with self._lock:
+            return {target: sum(stacks.values()) for target, stacks in self.stacks.items()}
+
+    def reset(self, target: str):
+        with self._lock:
+            self.stacks.pop(target, None)
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if not self.active_frames:
+                    self._thread = None
+                    return
+
+            frame = sys._current_frames().get(self._loop_thread_id)
+            target = None
+            names = []
+            while frame is not None:
+                if target is None:
+                    target = self.active_frames.get(id(frame))
+                code = frame.f_code
+                names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            del frame
+
+            if target is not None:
+                stack = ";".join(reversed(names))
+                with self._lock:
+                    self.stacks.setdefault(target, Counter())[stack] += 1
+
+            time.sleep(self.interval)
+
+settings = get_settings()
+
+sampler = StackSampler(settings.profile_interval_ms / 1000)
+for _target in filter(None, (name.strip() for name in settings.profile_targets.split(","))):
+    sampler.sample_rates[_target] = settings.profile_sample_rate
+
+# Every name passed to @profiled, whether or not profiling is enabled
+TARGETS: set[str] = set()
+
+# Mark an async function as a profiling target
+def profiled(target: str):
+    TARGETS.add(target)
+
+    def decorator(fn):
+        if not settings.profiling_enabled:
+            return fn
+
+        @wraps(fn)
+        async def wrapper(*args, **kwargs):
+            if not sampler.should_sample(target):
+                return await fn(*args, **kwargs)
+
+            frame = sys._getframe()
+            sampler.begin(frame, target)
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                sampler.end(frame)
+
+        return wrapper
+    return decorator
@@ -1,6 +1,6 @@
 from datetime import timedelta
 from fastapi import HTTPException, Request
-from app.utils.redis_client import get_redis
+from app.utils.redis_client import redis_batch
 from app.config import get_settings
 
 # Check if a certain rate limit has been exceeded
@@ -8,26 +8,25 @@ async def check_rate_limit(
     key: str,
     max_requests: int,
     window_seconds: int,
+    cost: int = 1,
 ) -> None:
     settings = get_settings()
     if settings.debug:
         return  # Skip rate limiting in debug mode
 
-    redis_client = await get_redis()
-
-    # Increment counter
-    current = await redis_client.incr(key)
-
-    # Set expiry on first request
-    if current == 1:
-        await redis_client.expire(key, window_seconds)
+    # One round trip: start the window if there isn't one, increment the
+    # counter (batch requests count once per item) and read the time left
+    batch = await redis_batch()
+    batch.add("set", key, 0, ex=window_seconds, nx=True)
+    current = batch.add("incrby", key, cost)
+    ttl = batch.add("ttl", key)
+    await batch.execute()
 
     # Check if limit exceeded
-    if current > max_requests:
-        ttl = await redis_client.ttl(key)
+    if current.value > max_requests:
         raise HTTPException(
             status_code=429,
-            detail=f"Rate limit exceeded. Try again in {ttl} seconds."
+            detail=f"Rate limit exceeded. Try again in {ttl.value} seconds."
         )
 
 async def get_client_ip(request: Request) -> str:
@@ -1,40 +1,151 @@
+import asyncio
 import json
-import ssl
+import socket
+import time
 from typing import Any
 import redis.asyncio as redis
-from app.config import get_settings
+from redis.asyncio.client import Pipeline
+from redis.asyncio.connection import UnixDomainSocketConnection, parse_url
+from app.config import Settings, get_settings
+from app.utils.metrics import REDIS_TRIPS, count_round_trip, redis_command_duration, redis_pipeline_commands
 
-settings = get_settings()
+# Redis client that records per-command latency and per-request round trips
+class InstrumentedRedis(redis.Redis):
 
-# Global Redis connection pool
+    async def execute_command(self, *args, **options):
+        start = time.perf_counter()
+        try:
+            return await super().execute_command(*args, **options)
+        finally:
+            redis_command_duration.observe(time.perf_counter() - start, str(args[0]).lower())
+            count_round_trip(REDIS_TRIPS)
+
+    def pipeline(self, transaction: bool = True, shard_hint: str | None = None) -> Pipeline:
+        return InstrumentedPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
+
+# A pipeline is one round trip however many commands it carries
+class InstrumentedPipeline(Pipeline):
+
+    async def execute(self, raise_on_error: bool = True):
+        if not self.command_stack:
+            return await super().execute(raise_on_error)
+        redis_pipeline_commands.observe(len(self.command_stack))
+        start = time.perf_counter()
+        try:
+            return await super().execute(raise_on_error)
+        finally:
+            redis_command_duration.observe(time.perf_counter() - start, "pipeline")
+            count_round_trip(REDIS_TRIPS)
+
+# Global Redis connection pools (commands and pub/sub), and the client shared
+# by the whole process
 _redis_pool = None
+_pubsub_pool = None
+_redis_client = None
+
+# TCP keepalive probes, so a dead peer is noticed within
+# idle + interval * count seconds instead of on the next command's timeout.
+# Options the platform doesn't have are skipped.
+def keepalive_options(settings: Settings) -> dict[int, int]:
+    options = {
+        "TCP_KEEPIDLE": settings.redis_keepalive_idle,
+        "TCP_KEEPINTVL": settings.redis_keepalive_interval,
+        "TCP_KEEPCNT": settings.redis_keepalive_count,
+    }
+    return {getattr(socket, name): value for name, value in options.items() if hasattr(socket, name)}
+
+# Build a pool from the settings. REDIS_URL may be redis://, rediss:// or
+# unix://; with redis_socket_path set, the URL only supplies credentials and db.
+def create_pool(settings: Settings, pool_class=redis.BlockingConnectionPool, **overrides) -> redis.ConnectionPool:
+    options = parse_url(settings.redis_url)
+    if settings.redis_socket_path:
+        options.pop("host", None)
+        options.pop("port", None)
+        options.update(connection_class=UnixDomainSocketConnection, path=settings.redis_socket_path)
+
+    options.update(
+        encoding="utf-8",
+        decode_responses=True,
+        health_check_interval=settings.redis_health_check_interval,
+        socket_connect_timeout=settings.redis_connect_timeout,
+        socket_timeout=settings.redis_socket_timeout,
+    )
+    if issubclass(pool_class, redis.BlockingConnectionPool):
+        # Callers wait for a free connection instead of failing when all are busy
+        options.update(max_connections=settings.redis_max_connections, timeout=settings.redis_pool_timeout)
+    if options.get("connection_class") is not UnixDomainSocketConnection:
+        options.update(socket_keepalive=True, socket_keepalive_options=keepalive_options(settings))
+    # For Upstash (rediss://), disable SSL cert verification to avoid macOS issues
+    if settings.redis_url.startswith("rediss://"):
+        options["ssl_cert_reqs"] = "none"
 
-# Get Redis connection from pool
+    options.update(overrides)
+    return pool_class(**options)
+
+# Get the shared Redis client
 async def get_redis() -> redis.Redis:
-    global _redis_pool
-    if _redis_pool is None:
-        # For Upstash (rediss://), disable SSL cert verification to avoid macOS issues
-        if settings.redis_url.startswith("rediss://"):
-            _redis_pool = redis.ConnectionPool.from_url(
-                settings.redis_url,
-                encoding="utf-8",
-                decode_responses=True,
-                ssl_cert_reqs="none",
-            )
-        else:
-            _redis_pool = redis.ConnectionPool.from_url(
-                settings.redis_url,
-                encoding="utf-8",
-                decode_responses=True,
-            )
-    return redis.Redis(connection_pool=_redis_pool)
-
-# Close Redis connection
+    global _redis_pool, _redis_client
+    if _redis_client is None:
+        if _redis_pool is None:
+            _redis_pool = create_pool(get_settings())
+        _redis_client = InstrumentedRedis(connection_pool=_redis_pool)
+    return _redis_client
+
+# Client for subscriptions. A subscriber sits in a blocking read until the
+# next message, so its connections come from a separate pool with no socket
+# timeout, and don't use up the command pool's max_connections.
+def _pubsub_client() -> redis.Redis:
+    global _pubsub_pool
+    if _pubsub_pool is None:
+        _pubsub_pool = create_pool(get_settings(), redis.ConnectionPool, socket_timeout=None)
+    return redis.Redis(connection_pool=_pubsub_pool)
+
+# Commands queued from several helpers and sent in one round trip, for
+# handlers that need more than one unrelated value from Redis:
+#
+#   batch = await redis_batch()
+#   versions = batch.add("mget", keys)
+#   leaderboard = batch.add("get", LEADERBOARD_KEY)
+#   await batch.execute()
+#   versions.value, leaderboard.value
+class Pending:
+    __slots__ = ("value",)
+
+class RedisBatch:
+
+    def __init__(self, redis_client: redis.Redis):
+        self.pipe = redis_client.pipeline(transaction=False)
+        self.pending: list[Pending] = []
+
+    # Queue a command; its reply is set on the returned Pending by execute()
+    def add(self, command: str, *args, **kwargs) -> Pending:
+        getattr(self.pipe, command)(*args, **kwargs)
+        pending = Pending()
+        self.pending.append(pending)
+        return pending
+
+    async def execute(self):
+        replies = await self.pipe.execute()
+        for pending, reply in zip(self.pending, replies):
+            pending.value = reply
+
+async def redis_batch() -> RedisBatch:
+    return RedisBatch(await get_redis())
+
+# Open `connections` pool connections up front so the first requests after a
+# start don't pay for the TCP/TLS handshakes
+async def warm_redis(connections: int):
+    redis_client = await get_redis()
+    await asyncio.gather(*(redis_client.ping() for _ in range(connections)))
+
+# Close Redis connections
 async def close_redis():
-    global _redis_pool
-    if _redis_pool:
-        await _redis_pool.disconnect()
-        _redis_pool = None
+    global _redis_pool, _pubsub_pool, _redis_client
+    _redis_client = None
+    for pool in (_redis_pool, _pubsub_pool):
+        if pool:
+            await pool.disconnect()
+    _redis_pool = _pubsub_pool = None
 
 # Publish a message to a Redis channel
 async def publish_message(channel: str, message: dict[str, Any]):
@@ -43,8 +154,7 @@ async def publish_message(channel: str, message: dict[str, Any]):
 
 # Subscribe to a Redis channel and yield messages
 async def subscribe_channel(channel: str):
-    redis_client = await get_redis()
-    pubsub = redis_client.pubsub()
+    pubsub = _pubsub_client().pubsub()
     await pubsub.subscribe(channel)
 
     try:
@@ -57,4 +167,21 @@ async def subscribe_channel(channel: str):
                     continue
     finally:
         await pubsub.unsubscribe(channel)
-        await pubsub.close()
\ No newline at end of file
+        await pubsub.close()
+
+# Subscribe to every channel matching a pattern and yield (channel, message)
+async def subscribe_pattern(pattern: str):
+    pubsub = _pubsub_client().pubsub()
+    await pubsub.psubscribe(pattern)
+
+    try:
+        async for message in pubsub.listen():
+            if message["type"] == "pmessage":
+                try:
+                    data = json.loads(message["data"])
+                    yield message["channel"], data
+                except json.JSONDecodeError:
+                    continue
+    finally:
+        await pubsub.punsubscribe(pattern)
+        await pubsub.close()
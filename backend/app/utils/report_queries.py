@@ -0,0 +1,66 @@
+from datetime import datetime
+from uuid import UUID, uuid4
+from sqlalchemy import exists, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
+from app.models import Take, Comment, Report
+
+# Report ingestion in one statement. A data-modifying CTE inserts the report,
+# which is a no-op if this reporter already reported the target, and the
+# target's counter only moves (and its flags only flip) if a row went in. A
+# brigade therefore costs one short UPDATE of the target per distinct
+# reporter, and repeat reports never touch the target at all.
+#
+# Returns the target's new report_count and is_hidden (plus take_id for
+# comments), or no row if the report was a duplicate.
+
+def record_report_statement(
+    target_type: str,
+    target_id: UUID,
+    take_created_at: datetime,
+    reason: str,
+    reporter_key: str,
+    reporter_user_id: UUID | None,
+    flag_threshold: int,
+    hide_threshold: int,
+):
+    inserted = (
+        insert(Report.__table__)
+        .values(
+            id=uuid4(),
+            target_type=target_type,
+            target_id=target_id,
+            reason=reason,
+            reporter_key=reporter_key,
+            reporter_user_id=reporter_user_id,
+        )
+        .on_conflict_do_nothing(index_elements=["target_type", "target_id", "reporter_key"])
+        .returning(Report.id)
+        .cte("inserted")
+    )
+
+    if target_type == "take":
+        model = Take
+        target = (Take.id == target_id, Take.created_at == take_created_at)
+        returning = (Take.report_count, Take.is_hidden)
+    else:
+        model = Comment
+        target = (Comment.id == target_id, Comment.take_created_at == take_created_at)
+        returning = (Comment.report_count, Comment.is_hidden, Comment.take_id)
+
+    # SET expressions see the old row, so these are the post-increment counts.
+    # Thresholds trigger on the report that reaches them, not every one after,
+    # so content a moderator has cleared stays cleared.
+    report_count = model.report_count + 1
+    values = {"report_count": report_count}
+    if flag_threshold > 0:
+        values["is_flagged"] = or_(model.is_flagged, report_count == flag_threshold)
+    if hide_threshold > 0:
+        values["is_hidden"] = or_(model.is_hidden, report_count == hide_threshold)
+
+    return (
+        update(model)
+        .where(*target, model.is_hidden == False, exists(select(inserted.c.id)))
+        .values(**values)
+        .returning(*returning)
+        .execution_options(query_name="record_report", synchronize_session=False)
+    )
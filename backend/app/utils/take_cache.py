@@ -0,0 +1,173 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.utils.feed_queries import take_detail_query
+from app.utils.metrics import Counter
+
+# In-process cache of take details, keyed by take id.
+#
+# Nearly every request about a single take starts by looking the take up
+# (does it exist, is it hidden, who owns it, when was it created). Entries are
+# kept coherent by the pub/sub listeners that already run in every process:
+# like_update, delete_take, new_comment and delete_comment events (and their
+# bulk moderation counterparts) patch the cached copy.
+# Entries expire after a short TTL in case an event is missed, and the cache
+# is cleared whenever a listener has to resubscribe.
+#
+# Detail reads pass the take's ETag version: an entry is only served if it was
+# loaded at that version, so a response body always matches its ETag. Events
+# drop the version, so the next detail read after a change reloads once.
+
+take_cache_lookups = Counter(
+    "take_cache_lookups_total", "Take cache lookups", ("result",),
+)
+take_cache_evictions = Counter(
+    "take_cache_evictions_total", "Take cache entries evicted to stay under the size limit",
+)
+
+@dataclass(slots=True)
+class CachedTake:
+    id: UUID
+    user_id: UUID
+    content: str
+    username: str
+    created_at: datetime
+    like_count: int
+    comment_count: int
+    is_hidden: bool
+    version: str | None
+    expires_at: float
+
+class TakeCache:
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.entries: OrderedDict[UUID, CachedTake] = OrderedDict()
+
+    # Cached take, or None on a miss. With `version`, entries loaded at any
+    # other version count as misses.
+    def get(self, take_id: UUID, version: str | None = None) -> CachedTake | None:
+        entry = self.entries.get(take_id)
+        if entry is not None and (entry.expires_at <= time.monotonic() or (version and entry.version != version)):
+            del self.entries[take_id]
+            entry = None
+
+        if entry is None:
+            take_cache_lookups.inc("miss")
+            return None
+        self.entries.move_to_end(take_id)
+        take_cache_lookups.inc("hit")
+        return entry
+
+    def put(self, row, version: str | None = None) -> CachedTake:
+        entry = CachedTake(
+            id=row.id,
+            user_id=row.user_id,
+            content=row.content,
+            username=row.username,
+            created_at=row.created_at,
+            like_count=row.like_count,
+            comment_count=row.comment_count,
+            is_hidden=row.is_hidden,
+            version=version,
+            expires_at=time.monotonic() + self.ttl,
+        )
+        if self.max_size <= 0:
+            return entry
+
+        self.entries[entry.id] = entry
+        self.entries.move_to_end(entry.id)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+            take_cache_evictions.inc()
+        return entry
+
+    def invalidate(self, take_id: UUID):
+        self.entries.pop(take_id, None)
+
+    def clear(self):
+        self.entries.clear()
+
+    # Patch the cached copy from a feed event
+    def apply_feed_event(self, message: dict[str, Any]):
+        kind = message.get("type")
+        if kind == "hide_takes":
+            for take_id in message["data"]["ids"]:
+                entry = self.entries.get(UUID(take_id))
+                if entry is not None:
+                    entry.is_hidden = True
+                    entry.version = None
+            return
+        if kind == "unhide_takes":
+            for take_id in message["data"]["ids"]:
+                self.invalidate(UUID(take_id))
+            return
+        if kind not in ("like_update", "delete_take"):
+            return
+        entry = self.entries.get(UUID(message["data"]["id"]))
+        if entry is None:
+            return
+        if kind == "like_update":
+            entry.like_count = message["data"]["like_count"]
+        else:
+            entry.is_hidden = True
+        entry.version = None
+
+    # Patch the cached copy from a comments:<take_id> event
+    def apply_comment_event(self, take_id: str, message: dict[str, Any]):
+        kind = message.get("type")
+        if kind == "new_comment":
+            delta = 1
+        elif kind == "delete_comment":
+            delta = -1
+        elif kind in ("hide_comments", "unhide_comments"):
+            delta = len(message["data"]["ids"]) * (-1 if kind == "hide_comments" else 1)
+        else:
+            return
+        entry = self.entries.get(UUID(take_id))
+        if entry is not None:
+            entry.comment_count = max(0, entry.comment_count + delta)
+            entry.version = None
+
+settings = get_settings()
+take_cache = TakeCache(settings.take_cache_size, settings.take_cache_ttl_seconds)
+
+# The take, hidden or not, from the cache or else the database. None if it
+# doesn't exist.
+async def load_take(db: AsyncSession, take_id: UUID, version: str | None = None) -> CachedTake | None:
+    entry = take_cache.get(take_id, version)
+    if entry is not None:
+        return entry
+
+    result = await db.execute(take_detail_query(take_id))
+    row = result.one_or_none()
+    if row is None:
+        return None
+    return take_cache.put(row, version)
+
+# The take if it exists and isn't hidden
+async def load_visible_take(db: AsyncSession, take_id: UUID, version: str | None = None) -> CachedTake | None:
+    entry = await load_take(db, take_id, version)
+    if entry is None or entry.is_hidden:
+        return None
+    return entry
+
+# TakeResponse-shaped dict for a cached take
+def cached_take_payload(entry: CachedTake, user_liked: bool) -> dict:
+    return {
+        "id": entry.id,
+        "content": entry.content,
+        "like_count": entry.like_count,
+        "comment_count": entry.comment_count,
+        "created_at": entry.created_at,
+        "username": entry.username,
+        "user_liked": user_liked,
+    }
@@ -1,4 +1,10 @@
-import random
+import math
+from fastapi import HTTPException
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import get_settings
+from app.models import User
 
 ADJECTIVES = [
     "Spicy", "Bold", "Chaotic", "Sleepy", "Cosmic", "Wild", "Chill", "Fierce",
@@ -15,9 +21,60 @@ NOUNS = [
     "Raccoon", "Tofu", "Wombat", "Nugget", "Muffin", "Badger", "Falcon", "Gecko",
 ]
 
-# Generate a random funny username SleepyDumpling67
-def generate_username() -> str:
-    adjective = random.choice(ADJECTIVES)
-    noun = random.choice(NOUNS)
-    number = random.randint(1, 2000)
-    return f"{adjective}{noun}{number}"
\ No newline at end of file
+USERNAME_SEQUENCE = "username_seq"
+
+# Sequence values are mapped to names with n -> (n * multiplier + OFFSET) mod
+# namespace size, a bijection as long as the multiplier is coprime with the
+# size. A multiplier near size / golden ratio spreads consecutive values
+# across the namespace, so names look random but never repeat.
+GOLDEN_RATIO_FRACTION = 0.6180339887
+PERMUTATION_OFFSET = 1_000_003
+
+# Only names handed out before the allocator existed can collide. After a
+# collision, this many candidates are fetched per round trip.
+CANDIDATES_PER_FETCH = 3
+MAX_FETCHES = 3
+
+# Funny username for sequence value n, e.g. SleepyDumpling67
+def username_for(n: int, max_number: int | None = None) -> str:
+    max_number = max_number or get_settings().username_max_number
+    size = len(ADJECTIVES) * len(NOUNS) * max_number
+
+    multiplier = int(size * GOLDEN_RATIO_FRACTION) | 1
+    while math.gcd(multiplier, size) != 1:
+        multiplier += 2
+
+    index = (n * multiplier + PERMUTATION_OFFSET) % size
+    index, number = divmod(index, max_number)
+    adjective, noun = divmod(index, len(NOUNS))
+    username = f"{ADJECTIVES[adjective]}{NOUNS[noun]}{number + 1}"
+
+    # Once the namespace is used up, a cycle suffix keeps names distinct
+    cycle = n // size
+    return f"{username}_{cycle}" if cycle else username
+
+async def next_usernames(db: AsyncSession, count: int) -> list[str]:
+    result = await db.execute(
+        text(f"SELECT nextval('{USERNAME_SEQUENCE}') FROM generate_series(1, :count)"),
+        {"count": count},
+    )
+    return [username_for(n) for n in result.scalars()]
+
+# Insert a user with a freshly allocated username. Takes two round trips
+# (nextval, then INSERT ... ON CONFLICT DO NOTHING) however many users exist.
+async def create_user(db: AsyncSession, **fields) -> User:
+    count = 1
+    for _ in range(MAX_FETCHES):
+        for username in await next_usernames(db, count):
+            result = await db.execute(
+                insert(User)
+                .values(username=username, **fields)
+                .on_conflict_do_nothing(index_elements=[User.username])
+                .returning(User)
+            )
+            user = result.scalar_one_or_none()
+            if user:
+                return user
+        count = CANDIDATES_PER_FETCH
+
+    raise HTTPException(status_code=500, detail="Could not generate unique username")
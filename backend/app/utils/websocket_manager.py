@@ -1,38 +1,112 @@
 import asyncio
+import logging
+import math
+import time
 from typing import Set
+import orjson
 from fastapi import WebSocket
-from app.utils.redis_client import subscribe_channel
+from app.utils.redis_client import subscribe_channel, subscribe_pattern
+from app.utils.metrics import ws_broadcast_duration, ws_messages_sent
+from app.utils.profiling import profiled
+from app.utils.take_cache import take_cache
+
+logger = logging.getLogger(__name__)
+
+# Close code telling clients the server is restarting and they should
+# reconnect (the frontend waits a random delay first)
+SERVICE_RESTART = 1012
+
+# Connections are closed in this many batches spread over the drain window
+DRAIN_BATCHES = 10
+
+# Seconds to wait before resubscribing after the Redis connection drops
+RESUBSCRIBE_DELAY = 1.0
+
+async def _close_for_restart(websocket: WebSocket):
+    try:
+        await websocket.close(code=SERVICE_RESTART, reason="Server restarting")
+    except Exception:
+        pass
+
+# Close sockets in batches over `duration` seconds
+async def close_gradually(connections: list[WebSocket], duration: float):
+    if not connections:
+        return
+    batch_size = math.ceil(len(connections) / DRAIN_BATCHES)
+    for offset in range(0, len(connections), batch_size):
+        await asyncio.gather(*(_close_for_restart(ws) for ws in connections[offset:offset + batch_size]))
+        await asyncio.sleep(duration / DRAIN_BATCHES)
 
 # Manages WebSocket connections and message broadcasting
 class ConnectionManager:
 
     def __init__(self):
         self.active_connections: Set[WebSocket] = set()
+        self.accepting = True
+        self.listener: asyncio.Task | None = None
 
-    # Accept and store a new WebSocket connection
-    async def connect(self, websocket: WebSocket):
+    # Accept and store a new WebSocket connection. Returns False if the server
+    # is shutting down, in which case the socket is closed straight away.
+    async def connect(self, websocket: WebSocket) -> bool:
         await websocket.accept()
+        if not self.accepting:
+            await _close_for_restart(websocket)
+            return False
         self.active_connections.add(websocket)
+        return True
 
     def disconnect(self, websocket: WebSocket):
         self.active_connections.discard(websocket)
 
-    # Send a message to all connected clients
+    # Send a message to all connected clients. The message is encoded once and
+    # the same text frame is sent to every socket.
+    @profiled("ws_broadcast")
     async def broadcast(self, message: dict):
+        start = time.perf_counter()
+        payload = orjson.dumps(message).decode()
         dead_connections = set()
-        for connection in self.active_connections:
+        for connection in list(self.active_connections):
             try:
-                await connection.send_json(message)
+                await connection.send_text(payload)
             except Exception:
                 dead_connections.add(connection)
 
         # Clean up dead connections
         self.active_connections -= dead_connections
 
+        ws_messages_sent.inc("feed", amount=len(self.active_connections))
+        ws_broadcast_duration.observe(time.perf_counter() - start, "feed")
+
+    # Start the single Redis listener shared by every feed socket
+    def start(self, channel: str = "feed"):
+        self.listener = asyncio.create_task(self._listen_to_redis(channel))
+
     # Listen to Redis channel and broadcast messages to WebSocket clients
-    async def listen_to_redis(self, channel: str):
-        async for message in subscribe_channel(channel):
-            await self.broadcast(message)
+    # (patching the take cache on the way), resubscribing if the connection
+    # drops
+    async def _listen_to_redis(self, channel: str):
+        while True:
+            try:
+                async for message in subscribe_channel(channel):
+                    take_cache.apply_feed_event(message)
+                    await self.broadcast(message)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Feed listener failed, resubscribing")
+            # Events may have been missed while unsubscribed
+            take_cache.clear()
+            await asyncio.sleep(RESUBSCRIBE_DELAY)
+
+    # Stop accepting sockets, close the open ones over `duration` seconds and
+    # stop listening
+    async def drain(self, duration: float):
+        self.accepting = False
+        await close_gradually(list(self.active_connections), duration)
+        self.active_connections.clear()
+        if self.listener:
+            self.listener.cancel()
+            self.listener = None
 
 # Manages WebSocket connections for specific take comments
 class TakeCommentsManager:
@@ -40,23 +114,21 @@ class TakeCommentsManager:
     def __init__(self):
         # Map of take_id -> set of WebSocket connections
         self.connections: dict[str, Set[WebSocket]] = {}
-        # Map of take_id -> asyncio task listening to Redis
-        self.redis_tasks: dict[str, asyncio.Task] = {}
+        self.accepting = True
+        self.listener: asyncio.Task | None = None
 
     # Accept and store a new WebSocket connection for a specific take
-    async def connect(self, take_id: str, websocket: WebSocket):
+    async def connect(self, take_id: str, websocket: WebSocket) -> bool:
         await websocket.accept()
+        if not self.accepting:
+            await _close_for_restart(websocket)
+            return False
 
         if take_id not in self.connections:
             self.connections[take_id] = set()
 
         self.connections[take_id].add(websocket)
-
-        # Start Redis listener if not already running
-        if take_id not in self.redis_tasks or self.redis_tasks[take_id].done():
-            self.redis_tasks[take_id] = asyncio.create_task(
-                self._listen_to_redis(take_id)
-            )
+        return True
 
     def disconnect(self, take_id: str, websocket: WebSocket):
         if take_id in self.connections:
@@ -65,31 +137,61 @@ class TakeCommentsManager:
             # Clean up if no more connections
             if not self.connections[take_id]:
                 del self.connections[take_id]
-                if take_id in self.redis_tasks:
-                    self.redis_tasks[take_id].cancel()
-                    del self.redis_tasks[take_id]
 
     # Send a message to all clients subscribed to a specific take
+    @profiled("ws_broadcast")
     async def broadcast_to_take(self, take_id: str, message: dict):
         if take_id not in self.connections:
             return
 
+        start = time.perf_counter()
+        payload = orjson.dumps(message).decode()
         dead_connections = set()
-        for connection in self.connections[take_id]:
+        for connection in list(self.connections[take_id]):
             try:
-                await connection.send_json(message)
+                await connection.send_text(payload)
             except Exception:
                 dead_connections.add(connection)
 
         # Clean up dead connections
-        self.connections[take_id] -= dead_connections
+        if take_id in self.connections:
+            self.connections[take_id] -= dead_connections
 
-    # Listen to Redis channel for a specific take and broadcast messages
-    async def _listen_to_redis(self, take_id: str):
-        channel = f"comments:{take_id}"
-        async for message in subscribe_channel(channel):
-            await self.broadcast_to_take(take_id, message)
+        ws_messages_sent.inc("comments", amount=len(self.connections.get(take_id, ())))
+        ws_broadcast_duration.observe(time.perf_counter() - start, "comments")
+
+    # One pattern subscription covers every take's comment channel, so the
+    # number of Redis connections doesn't grow with the takes being watched
+    def start(self, pattern: str = "comments:*"):
+        self.listener = asyncio.create_task(self._listen_to_redis(pattern))
+
+    async def _listen_to_redis(self, pattern: str):
+        while True:
+            try:
+                async for channel, message in subscribe_pattern(pattern):
+                    take_id = channel.split(":", 1)[1]
+                    take_cache.apply_comment_event(take_id, message)
+                    await self.broadcast_to_take(take_id, message)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Comments listener failed, resubscribing")
+            take_cache.clear()
+            await asyncio.sleep(RESUBSCRIBE_DELAY)
+
+    async def drain(self, duration: float):
+        self.accepting = False
+        connections = [ws for sockets in self.connections.values() for ws in sockets]
+        await close_gradually(connections, duration)
+        self.connections.clear()
+        if self.listener:
+            self.listener.cancel()
+            self.listener = None
 
 # Global instances
 feed_manager = ConnectionManager()
-comments_manager = TakeCommentsManager()
\ No newline at end of file
+comments_manager = TakeCommentsManager()
+
+# Close every WebSocket with SERVICE_RESTART, spread over `duration` seconds
+async def drain_websockets(duration: float):
+    await asyncio.gather(feed_manager.drain(duration), comments_manager.drain(duration))
@@ -0,0 +1,70 @@
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Shared helpers for the benchmark scripts: latency summaries and JSON
+# result files named after the commit they were measured on.
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, round(pct / 100 * (len(sorted_values) - 1)))
+    return sorted_values[index]
+
+# Summarize a list of latencies (seconds) measured over `elapsed` seconds
+def summarize(latencies: list[float], elapsed: float, errors: int = 0) -> dict:
+    values = sorted(latencies)
+    return {
+        "count": len(values),
+        "errors": errors,
+        "throughput_per_s": round(len(values) / elapsed, 1) if elapsed else 0.0,
+        "mean_ms": round(statistics.fmean(values) * 1000, 3) if values else 0.0,
+        "p50_ms": round(percentile(values, 50) * 1000, 3),
+        "p99_ms": round(percentile(values, 99) * 1000, 3),
+        "max_ms": round(values[-1] * 1000, 3) if values else 0.0,
+    }
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+# Write results to benchmarks/results/<suite>-<commit>-<timestamp>.json
+def save_results(suite: str, config: dict, results: dict, output: str | None = None) -> Path:
+    commit = git_commit()
+    now = datetime.now(timezone.utc)
+    payload = {
+        "suite": suite,
+        "commit": commit,
+        "timestamp": now.isoformat(),
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+        "config": config,
+        "results": results,
+    }
+
+    path = Path(output) if output else RESULTS_DIR / f"{suite}-{commit}-{now:%Y%m%dT%H%M%S}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(payload, indent=2) + "\n")
+    return path
+
+def print_results(results: dict):
+    for name, stats in results.items():
+        fields = "  ".join(f"{key}={value}" for key, value in stats.items())
+        print(f"{name:28} {fields}")
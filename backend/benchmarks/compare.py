@@ -0,0 +1,46 @@
+import argparse
+import json
+from pathlib import Path
+
+# Compare two benchmark result files and flag regressions.
+#
+#   python -m benchmarks.compare results/api-abc123-....json results/api-def456-....json
+#
+# Exits non-zero if any p50/p99 got slower, or throughput dropped, by more
+# than --threshold percent.
+
+LOWER_IS_BETTER = ("p50_ms", "p99_ms", "mean_ms")
+HIGHER_IS_BETTER = ("throughput_per_s",)
+
+def load(path: str) -> dict:
+    return json.loads(Path(path).read_text())
+
+def compare(before: dict, after: dict, threshold: float) -> tuple[list[str], bool]:
+    lines = []
+    regressed = False
+    for name, new in after["results"].items():
+        old = before["results"].get(name)
+        if not old:
+            continue
+        for key in LOWER_IS_BETTER + HIGHER_IS_BETTER:
+            if key not in old or key not in new or not old[key]:
+                continue
+            change = (new[key] - old[key]) / old[key] * 100
+            worse = change > threshold if key in LOWER_IS_BETTER else change < -threshold
+            regressed = regressed or worse
+            marker = "  REGRESSION" if worse else ""
+            lines.append(f"{name:28} {key:17} {old[key]:>10} -> {new[key]:>10} ({change:+.1f}%){marker}")
+    return lines, regressed
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    parser.add_argument("before")
+    parser.add_argument("after")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Allowed change in percent")
+    args = parser.parse_args()
+
+    before, after = load(args.before), load(args.after)
+    print(f"{before['commit']} -> {after['commit']}")
+    lines, regressed = compare(before, after, args.threshold)
+    print("\n".join(lines))
+    raise SystemExit(1 if regressed else 0)
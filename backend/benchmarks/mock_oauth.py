@@ -0,0 +1,101 @@
+import argparse
+import asyncio
+import base64
+import secrets
+import time
+from urllib.parse import urlencode
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import rsa
+from fastapi import FastAPI, Form, Header, HTTPException
+from fastapi.responses import RedirectResponse
+
+# A local stand-in for Google's OAuth endpoints, for trying logins and
+# benchmarking the callback offline. Start it, then point the API at it:
+#
+#   python -m benchmarks.mock_oauth --port 9000
+#   GOOGLE_AUTH_URL=http://127.0.0.1:9000/auth GOOGLE_TOKEN_URL=http://127.0.0.1:9000/token \
+#   GOOGLE_USERINFO_URL=http://127.0.0.1:9000/userinfo GOOGLE_JWKS_URL=http://127.0.0.1:9000/certs \
+#   GOOGLE_ISSUER=http://127.0.0.1:9000 GOOGLE_CLIENT_ID=mock-client python -m app.server
+#
+# /auth redirects straight back with a code; every code is accepted and maps
+# to a stable fake user, so repeated logins exercise the existing-user path.
+
+KID = "mock-key"
+
+def _b64(number: int) -> str:
+    raw = number.to_bytes((number.bit_length() + 7) // 8, "big")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+def create_app(issuer: str, latency: float = 0.0) -> FastAPI:
+    app = FastAPI()
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    public_numbers = private_key.public_key().public_numbers()
+    # access token -> user
+    users: dict[str, dict] = {}
+
+    async def simulate_latency():
+        if latency:
+            await asyncio.sleep(latency)
+
+    def user_for_code(code: str) -> dict:
+        return {"id": f"mock-{code}", "email": f"{code}@mock.local", "verified_email": True}
+
+    @app.get("/auth")
+    async def auth(redirect_uri: str, state: str | None = None):
+        params = {"code": secrets.token_hex(8)}
+        if state:
+            params["state"] = state
+        return RedirectResponse(f"{redirect_uri}?{urlencode(params)}")
+
+    @app.post("/token")
+    async def token(code: str = Form(...), client_id: str = Form(...)):
+        await simulate_latency()
+        user = user_for_code(code)
+        access_token = secrets.token_hex(16)
+        users[access_token] = user
+        now = int(time.time())
+        id_token = jwt.encode(
+            {
+                "iss": issuer,
+                "aud": client_id,
+                "sub": user["id"],
+                "email": user["email"],
+                "email_verified": True,
+                "iat": now,
+                "exp": now + 3600,
+            },
+            private_key,
+            algorithm="RS256",
+            headers={"kid": KID},
+        )
+        return {"access_token": access_token, "id_token": id_token, "token_type": "Bearer", "expires_in": 3600}
+
+    @app.get("/userinfo")
+    async def userinfo(authorization: str = Header("")):
+        await simulate_latency()
+        user = users.get(authorization.removeprefix("Bearer "))
+        if not user:
+            raise HTTPException(status_code=401)
+        return user
+
+    @app.get("/certs")
+    async def certs():
+        await simulate_latency()
+        key = {"kty": "RSA", "alg": "RS256", "use": "sig", "kid": KID,
+               "n": _b64(public_numbers.n), "e": _b64(public_numbers.e)}
+        return {"keys": [key]}
+
+    return app
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Run a mock Google OAuth server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Added delay per request")
+    args = parser.parse_args()
+
+    issuer = f"http://{args.host}:{args.port}"
+    uvicorn.run(create_app(issuer, args.latency_ms / 1000), host=args.host, port=args.port)
@@ -0,0 +1,79 @@
+import argparse
+import asyncio
+import os
+import time
+
+from benchmarks.common import free_port, print_results, save_results, summarize
+
+# Google login cost without the database: time get_google_user() against the
+# mock OAuth server, with the shared keep-alive client vs a new client per
+# login, and with id_token verification vs the userinfo round trip.
+#
+#   python -m benchmarks.oauth --logins 500 --latency-ms 20
+
+async def start_mock(port: int, latency: float):
+    import uvicorn
+
+    from benchmarks.mock_oauth import create_app
+
+    issuer = f"http://127.0.0.1:{port}"
+    server = uvicorn.Server(uvicorn.Config(create_app(issuer, latency), host="127.0.0.1", port=port, log_level="warning"))
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+    return server, task
+
+async def run_logins(count: int, verify_id_token: bool, fresh_client: bool) -> dict:
+    from app.config import get_settings
+    from app.utils.google_oauth import get_google_user
+    from app.utils.http_client import close_http_client
+
+    get_settings().google_verify_id_token = verify_id_token
+    latencies = []
+    start = time.perf_counter()
+    for i in range(count):
+        login_start = time.perf_counter()
+        await get_google_user(f"bench{i}")
+        latencies.append(time.perf_counter() - login_start)
+        if fresh_client:
+            await close_http_client()
+    return summarize(latencies, time.perf_counter() - start)
+
+async def main(args) -> dict:
+    port = free_port()
+    base = f"http://127.0.0.1:{port}"
+    os.environ.update({
+        "GOOGLE_CLIENT_ID": "mock-client",
+        "GOOGLE_TOKEN_URL": f"{base}/token",
+        "GOOGLE_USERINFO_URL": f"{base}/userinfo",
+        "GOOGLE_JWKS_URL": f"{base}/certs",
+        "GOOGLE_ISSUER": base,
+    })
+    server, task = await start_mock(port, args.latency_ms / 1000)
+
+    results = {}
+    try:
+        for label, verify_id_token, fresh_client in (
+            ("userinfo_fresh_client", False, True),
+            ("userinfo_shared_client", False, False),
+            ("id_token_shared_client", True, False),
+        ):
+            results[label] = await run_logins(args.logins, verify_id_token, fresh_client)
+    finally:
+        from app.utils.http_client import close_http_client
+
+        await close_http_client()
+        server.should_exit = True
+        await task
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the Google OAuth callback against a mock server")
+    parser.add_argument("--logins", type=int, default=500)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Simulated per-request delay at the mock server")
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    results = asyncio.run(main(args))
+    print_results(results)
+    print(f"Saved {save_results('oauth', vars(args), results, args.output)}")
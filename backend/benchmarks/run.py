@@ -0,0 +1,247 @@
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import time
+
+import httpx
+from sqlalchemy import text
+
+from benchmarks.common import free_port, print_results, save_results, summarize
+
+# Load test for the HTTP API and WebSocket fan-out.
+#
+# By default the app is served in-process by uvicorn on a free local port and
+# driven from the same event loop; pass --url to drive a separately started
+# server instead. Postgres comes from DATABASE_URL (seed it first with
+# benchmarks.seed); --fake-redis swaps Redis for an in-process fakeredis.
+#
+#   python -m benchmarks.run --fake-redis
+#   python -m benchmarks.run --scenarios feed,ws --subscribers 2000
+
+SORTS = ("newest", "hottest_24h", "hottest_7d")
+ALL_SCENARIOS = ("feed", "likes", "comments", "ws")
+
+# Point the app's Redis pools at an in-process fakeredis server
+def use_fake_redis():
+    import fakeredis
+    import redis.asyncio as redis
+    from fakeredis.aioredis import FakeConnection
+
+    from app.utils import redis_client
+
+    redis_client._redis_pool = redis_client._pubsub_pool = redis.ConnectionPool(
+        connection_class=FakeConnection,
+        server=fakeredis.FakeServer(),
+        encoding="utf-8",
+        decode_responses=True,
+    )
+
+async def start_server(port: int):
+    import uvicorn
+
+    from app.main import app
+    from app.server import uvicorn_options
+
+    config = uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", **uvicorn_options())
+    server = uvicorn.Server(config)
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        if task.done():
+            task.result()
+        await asyncio.sleep(0.05)
+    return server, task
+
+# Run `total` requests from `concurrency` workers. `send(i)` performs request
+# number i and returns the response.
+async def drive(send, total: int, concurrency: int) -> dict:
+    counter = itertools.count()
+    latencies: list[float] = []
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        while (i := next(counter)) < total:
+            start = time.perf_counter()
+            try:
+                response = await send(i)
+                ok = response.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            if ok:
+                latencies.append(time.perf_counter() - start)
+            else:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, time.perf_counter() - start, errors)
+
+async def load_fixtures(users: int) -> tuple[list[tuple[str, str]], list[str]]:
+    from app.database import engine
+    from app.utils.jwt import create_session_token
+
+    async with engine.connect() as conn:
+        user_ids = (await conn.execute(text(
+            "SELECT id FROM users WHERE email LIKE '%@bench.local' LIMIT :n"
+        ), {"n": users})).scalars().all()
+        take_ids = (await conn.execute(text(
+            "SELECT id FROM takes WHERE is_hidden = false ORDER BY created_at DESC LIMIT 1000"
+        ))).scalars().all()
+
+    if not user_ids or not take_ids:
+        raise SystemExit("No benchmark data found; run `python -m benchmarks.seed` first")
+
+    sessions = [(str(user_id), create_session_token(user_id)) for user_id in user_ids]
+    return sessions, [str(take_id) for take_id in take_ids]
+
+# Clear per-user rate limit counters so repeated runs aren't throttled
+async def reset_rate_limits(sessions: list[tuple[str, str]]):
+    from app.utils.redis_client import get_redis
+
+    redis_client = await get_redis()
+    keys = [f"{prefix}:{user_id}" for user_id, _ in sessions for prefix in ("like", "comment")]
+    for offset in range(0, len(keys), 1000):
+        await redis_client.delete(*keys[offset:offset + 1000])
+
+async def bench_feed(client: httpx.AsyncClient, sessions, args) -> dict:
+    results = {}
+    for sort in SORTS:
+        for label, headers in (("anon", {}), ("user", {"Cookie": f"session={sessions[0][1]}"})):
+            results[f"feed_{sort}_{label}"] = await drive(
+                lambda i: client.get("/takes", params={"sort": sort, "limit": 20}, headers=headers),
+                args.requests,
+                args.concurrency,
+            )
+    return results
+
+# Many users liking a handful of hot takes at once (row contention on like_count)
+async def bench_likes(client: httpx.AsyncClient, sessions, take_ids, args) -> dict:
+    hot = take_ids[:args.hot_takes]
+
+    async def send(i):
+        user_id, token = sessions[i % len(sessions)]
+        return await client.post(f"/takes/{hot[i % len(hot)]}/like", headers={"Cookie": f"session={token}"})
+
+    return {"like_storm": await drive(send, args.requests, args.concurrency)}
+
+async def bench_comments(client: httpx.AsyncClient, sessions, take_ids, args) -> dict:
+    async def send(i):
+        user_id, token = sessions[i % len(sessions)]
+        return await client.post(
+            f"/takes/{random.choice(take_ids)}/comments",
+            json={"content": f"benchmark comment {i}"},
+            headers={"Cookie": f"session={token}"},
+        )
+
+    return {"comment_post": await drive(send, args.requests, args.concurrency)}
+
+# Open N /ws/feed subscribers, publish messages to the feed channel and time
+# how long each takes to reach every subscriber.
+async def bench_ws(ws_url: str, args) -> dict:
+    import websockets
+
+    from app.utils.redis_client import publish_message
+
+    received: list[list[float]] = [[] for _ in range(args.subscribers)]
+    sockets = []
+    connect_limit = asyncio.Semaphore(200)
+
+    async def connect(index: int):
+        async with connect_limit:
+            sockets.append((index, await websockets.connect(f"{ws_url}/ws/feed", max_queue=None)))
+
+    async def listen(index: int, ws):
+        try:
+            async for raw in ws:
+                message = json.loads(raw)
+                if message.get("type") == "bench":
+                    received[index].append(time.perf_counter() - message["data"]["sent_at"])
+        except websockets.ConnectionClosed:
+            pass
+
+    start = time.perf_counter()
+    await asyncio.gather(*(connect(i) for i in range(args.subscribers)))
+    connect_time = time.perf_counter() - start
+    listeners = [asyncio.create_task(listen(index, ws)) for index, ws in sockets]
+    await asyncio.sleep(0.5)  # let server-side subscriptions settle
+
+    start = time.perf_counter()
+    for seq in range(args.messages):
+        await publish_message("feed", {"type": "bench", "data": {"seq": seq, "sent_at": time.perf_counter()}})
+        await asyncio.sleep(args.message_interval)
+
+    expected = args.subscribers * args.messages
+    deadline = time.perf_counter() + args.ws_timeout
+    while sum(map(len, received)) < expected and time.perf_counter() < deadline:
+        await asyncio.sleep(0.05)
+    elapsed = time.perf_counter() - start
+
+    for _, ws in sockets:
+        await ws.close()
+    for listener in listeners:
+        listener.cancel()
+
+    latencies = [latency for per_socket in received for latency in per_socket]
+    delivery = summarize(latencies, elapsed)
+    delivery["expected"] = expected
+    delivery["missing"] = sum(max(0, args.messages - len(r)) for r in received)
+    delivery["duplicates"] = sum(max(0, len(r) - args.messages) for r in received)
+    return {
+        "ws_connect": {"subscribers": len(sockets), "seconds": round(connect_time, 3)},
+        "ws_fanout_delivery": delivery,
+    }
+
+async def main(args) -> dict:
+    scenarios = args.scenarios.split(",")
+    if args.fake_redis:
+        use_fake_redis()
+
+    server = task = None
+    base_url = args.url
+    if not base_url:
+        port = free_port()
+        server, task = await start_server(port)
+        base_url = f"http://127.0.0.1:{port}"
+
+    sessions, take_ids = await load_fixtures(args.users)
+    await reset_rate_limits(sessions)
+
+    results = {}
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    try:
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+            if "feed" in scenarios:
+                results.update(await bench_feed(client, sessions, args))
+            if "likes" in scenarios:
+                results.update(await bench_likes(client, sessions, take_ids, args))
+            if "comments" in scenarios:
+                results.update(await bench_comments(client, sessions, take_ids, args))
+        if "ws" in scenarios:
+            results.update(await bench_ws(base_url.replace("http", "ws", 1), args))
+    finally:
+        if server:
+            server.should_exit = True
+            await task
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the API and WebSocket fan-out")
+    parser.add_argument("--url", help="Benchmark an already running server instead of an in-process one")
+    parser.add_argument("--fake-redis", action="store_true", help="Use in-process fakeredis instead of REDIS_URL")
+    parser.add_argument("--scenarios", default=",".join(ALL_SCENARIOS))
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per HTTP scenario")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--users", type=int, default=5000, help="Seeded users to authenticate as")
+    parser.add_argument("--hot-takes", type=int, default=10, help="Takes targeted by the like storm")
+    parser.add_argument("--subscribers", type=int, default=1000)
+    parser.add_argument("--messages", type=int, default=50)
+    parser.add_argument("--message-interval", type=float, default=0.02)
+    parser.add_argument("--ws-timeout", type=float, default=30.0)
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/api-<commit>-<time>.json)")
+    args = parser.parse_args()
+
+    results = asyncio.run(main(args))
+    print_results(results)
+    print(f"Saved {save_results('api', vars(args), results, args.output)}")
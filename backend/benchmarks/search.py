@@ -0,0 +1,89 @@
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import text
+
+from benchmarks.common import print_results, save_results, summarize
+from benchmarks.seed import DAYS_OF_HISTORY, TAKE_CONTENT_SQL, WORDS
+
+# Search latency as the corpus grows. Takes with word-based content are added
+# (to the already seeded bench users) until each --sizes total is reached,
+# then a fixed set of queries is timed through the same query builder the
+# /takes/search endpoint uses.
+#
+#   python -m benchmarks.seed --takes 0 --likes 0 --comments 0
+#   python -m benchmarks.search --sizes 10000 100000 1000000
+
+QUERIES = {
+    "common_word": ("campus", False),
+    "rare_word": ("geese", False),
+    "phrase": ('"bubble tea"', False),
+    "two_words": ("parking tuition", False),
+    "typo_fuzzy": ("constrution", True),
+}
+
+async def grow_takes(conn, target: int) -> int:
+    current = (await conn.execute(text("SELECT count(*) FROM takes"))).scalar_one()
+    missing = target - current
+    if missing > 0:
+        user_ids = (await conn.execute(text(
+            "SELECT id FROM users WHERE email LIKE '%@bench.local' LIMIT 1000"
+        ))).scalars().all()
+        if not user_ids:
+            raise SystemExit("No benchmark users found; run `python -m benchmarks.seed` first")
+
+        await conn.execute(text(f"""
+            INSERT INTO takes (id, user_id, content, like_count, created_at, is_hidden, is_flagged)
+            SELECT gen_random_uuid(), ((:user_ids)::uuid[])[1 + g % cardinality((:user_ids)::uuid[])],
+                   {TAKE_CONTENT_SQL}, 0,
+                   now() at time zone 'utc' - (:days * random()) * interval '1 day',
+                   false, false
+            FROM generate_series(1, :missing) AS g
+        """), {"missing": missing, "user_ids": user_ids, "days": DAYS_OF_HISTORY, "words": list(WORDS)})
+    return max(current, target)
+
+async def time_queries(engine, limit: int, iterations: int) -> dict:
+    from app.utils.feed_queries import search_takes_query
+
+    results = {}
+    async with engine.connect() as conn:
+        for name, (q, fuzzy) in QUERIES.items():
+            query, rank = search_takes_query(q, None, fuzzy)
+            query = query.order_by(rank.desc()).limit(limit)
+            await conn.execute(query)  # warm caches
+            latencies = []
+            start = time.perf_counter()
+            for _ in range(iterations):
+                query_start = time.perf_counter()
+                await conn.execute(query)
+                latencies.append(time.perf_counter() - query_start)
+            results[name] = summarize(latencies, time.perf_counter() - start)
+    return results
+
+async def main(args) -> dict:
+    from app.database import engine
+
+    results = {}
+    for size in sorted(args.sizes):
+        async with engine.begin() as conn:
+            await grow_takes(conn, size)
+        async with engine.begin() as conn:
+            await conn.execute(text("ANALYZE takes"))
+
+        for name, stats in (await time_queries(engine, args.limit, args.iterations)).items():
+            results[f"{name}_{size}"] = stats
+    await engine.dispose()
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark take search at growing corpus sizes")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    results = asyncio.run(main(args))
+    print_results(results)
+    print(f"Saved {save_results('search', vars(args), results, args.output)}")
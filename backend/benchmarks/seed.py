@@ -0,0 +1,161 @@
+import argparse
+import asyncio
+import time
+from datetime import datetime
+
+from sqlalchemy import text
+
+from app.utils.partitions import add_months, ensure_partitions
+
+# Seed a benchmark database with synthetic users, takes, likes and comments.
+# Everything is generated inside Postgres with generate_series, so 1M likes
+# takes seconds rather than minutes. Seeded users have @bench.local emails.
+#
+#   python -m benchmarks.seed --takes 100000 --likes 1000000
+
+DAYS_OF_HISTORY = 60
+
+# Vocabulary for synthetic take text, so full-text search has real words to
+# index. Words are drawn with a skew towards the front of the list.
+WORDS = (
+    "the campus food is honestly overrated and the library never has seats during midterms "
+    "co-op season makes everyone stressed about interviews rankings offers and rent in toronto "
+    "waterloo geese are the real owners of this university so respect them or get chased "
+    "engineering math computer science arts science health environment students all complain "
+    "about the plaza bubble tea lineups parking tuition residence wifi snow construction "
+    "professors assignments exams lectures tutorials labs projects deadlines group members "
+    "hot take unpopular opinion spicy controversial agree disagree fight me change my mind"
+).split()
+
+# SQL for one take's content: 5-40 words from WORDS (`g` is the row number)
+TAKE_CONTENT_SQL = """
+    array_to_string(ARRAY(
+        SELECT ((:words)::text[])[1 + floor(power(random(), 2) * cardinality((:words)::text[]))::int]
+        FROM generate_series(1, 5 + g % 36)
+    ), ' ')
+"""
+
+async def seed(users: int, takes: int, likes: int, comments: int, reset: bool = False):
+    from app.database import engine
+
+    months_back = DAYS_OF_HISTORY // 28 + 1
+    first_month = add_months(datetime.utcnow().date().replace(day=1), -months_back)
+
+    async with engine.begin() as conn:
+        if reset:
+            await reset_data(conn)
+
+        # Create partitions for the seeded history as well as the months ahead
+        await ensure_partitions(conn, months_ahead=months_back + 3, today=first_month)
+
+        await conn.execute(text("""
+            INSERT INTO users (id, email, username, created_at, last_seen_at)
+            SELECT gen_random_uuid(), 'bench' || i || '@bench.local', 'BenchUser' || i, now(), now()
+            FROM generate_series(1, :users) AS i
+        """), {"users": users})
+        await conn.execute(text("""
+            CREATE TEMP TABLE bench_users ON COMMIT DROP AS
+            SELECT id, row_number() OVER (ORDER BY id) AS n
+            FROM users WHERE email LIKE '%@bench.local'
+        """))
+        user_count = (await conn.execute(text("SELECT count(*) FROM bench_users"))).scalar_one()
+
+        # Takes are spread over the last DAYS_OF_HISTORY days, skewed towards recent
+        await conn.execute(text(f"""
+            INSERT INTO takes (id, user_id, content, like_count, created_at, is_hidden, is_flagged)
+            SELECT gen_random_uuid(), u.id,
+                   {TAKE_CONTENT_SQL},
+                   0,
+                   now() at time zone 'utc' - (:days * power(random(), 2)) * interval '1 day',
+                   false, false
+            FROM generate_series(1, :takes) AS g
+            JOIN bench_users u ON u.n = 1 + (g % :user_count)
+        """), {"takes": takes, "user_count": user_count, "days": DAYS_OF_HISTORY, "words": list(WORDS)})
+        await conn.execute(text("""
+            CREATE TEMP TABLE bench_takes ON COMMIT DROP AS
+            SELECT takes.id, takes.created_at, row_number() OVER (ORDER BY takes.id) AS n
+            FROM takes JOIN bench_users u ON u.id = takes.user_id
+        """))
+
+        # Each take gets a random number of likes from consecutive users, which
+        # keeps (take_id, user_id) unique without a dedupe pass
+        per_take = max(1, likes // max(takes, 1))
+        await conn.execute(text("""
+            INSERT INTO likes (id, take_id, take_created_at, user_id, created_at)
+            SELECT gen_random_uuid(), t.id, t.created_at, u.id, t.created_at
+            FROM bench_takes t
+            CROSS JOIN LATERAL generate_series(0, floor(random() * :per_take * 2)::int - 1) AS j
+            JOIN bench_users u ON u.n = 1 + ((t.n + j) % :user_count)
+        """), {"per_take": min(per_take, user_count // 2), "user_count": user_count})
+        await conn.execute(text("""
+            UPDATE takes SET like_count = counts.n
+            FROM (
+                SELECT likes.take_id, count(*) AS n
+                FROM likes JOIN bench_takes t ON t.id = likes.take_id AND t.created_at = likes.take_created_at
+                GROUP BY likes.take_id
+            ) AS counts
+            WHERE takes.id = counts.take_id
+        """))
+
+        per_take = max(1, comments // max(takes, 1))
+        await conn.execute(text("""
+            INSERT INTO comments (id, take_id, take_created_at, user_id, content, created_at, is_hidden, is_flagged)
+            SELECT gen_random_uuid(), t.id, t.created_at, u.id, md5(j::text || t.id::text), t.created_at, false, false
+            FROM bench_takes t
+            CROSS JOIN LATERAL generate_series(0, floor(random() * :per_take * 2)::int - 1) AS j
+            JOIN bench_users u ON u.n = 1 + ((t.n * 7 + j) % :user_count)
+        """), {"per_take": per_take, "user_count": user_count})
+
+    async with engine.begin() as conn:
+        await conn.execute(text("ANALYZE"))
+
+    await engine.dispose()
+
+# Remove what earlier seeds created: benchmark users and everything they wrote
+# or that was written on their takes. Real users' data is left alone.
+async def reset_data(conn):
+    await conn.execute(text("""
+        CREATE TEMP TABLE reset_users ON COMMIT DROP AS
+        SELECT id FROM users WHERE email LIKE '%@bench.local'
+    """))
+    await conn.execute(text("""
+        DELETE FROM reports
+        WHERE reporter_user_id IN (SELECT id FROM reset_users)
+           OR (target_type = 'take' AND target_id IN (
+                SELECT id FROM takes WHERE user_id IN (SELECT id FROM reset_users)))
+           OR (target_type = 'comment' AND target_id IN (
+                SELECT comments.id FROM comments
+                JOIN takes ON takes.id = comments.take_id AND takes.created_at = comments.take_created_at
+                WHERE comments.user_id IN (SELECT id FROM reset_users)
+                   OR takes.user_id IN (SELECT id FROM reset_users)))
+    """))
+    # Deleting the takes cascades to their likes and comments
+    await conn.execute(text("DELETE FROM likes WHERE user_id IN (SELECT id FROM reset_users)"))
+    await conn.execute(text("DELETE FROM comments WHERE user_id IN (SELECT id FROM reset_users)"))
+    await conn.execute(text("DELETE FROM takes WHERE user_id IN (SELECT id FROM reset_users)"))
+    await conn.execute(text("DELETE FROM users WHERE id IN (SELECT id FROM reset_users)"))
+    await conn.execute(text("DROP TABLE reset_users"))
+
+async def counts() -> dict[str, int]:
+    from app.database import engine
+
+    async with engine.connect() as conn:
+        result = {
+            table: (await conn.execute(text(f"SELECT count(*) FROM {table}"))).scalar_one()
+            for table in ("users", "takes", "likes", "comments")
+        }
+    await engine.dispose()
+    return result
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Seed the benchmark database")
+    parser.add_argument("--users", type=int, default=20_000)
+    parser.add_argument("--takes", type=int, default=100_000)
+    parser.add_argument("--likes", type=int, default=1_000_000)
+    parser.add_argument("--comments", type=int, default=200_000)
+    parser.add_argument("--reset", action="store_true", help="Delete previously seeded benchmark data first")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    asyncio.run(seed(args.users, args.takes, args.likes, args.comments, args.reset))
+    print(f"Seeded in {time.perf_counter() - start:.1f}s: {asyncio.run(counts())}")
@@ -0,0 +1,94 @@
+import argparse
+import asyncio
+import time
+import uuid
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.schemas.schemas import TakeResponse, TakesListResponse
+from app.utils.feed_queries import take_payload
+from benchmarks.common import print_results, save_results
+
+# Per-page serialization cost of a GET /takes response, before and after
+# encoding rows straight to JSON. No database needed.
+#
+#   python -m benchmarks.serialization --iterations 2000
+
+Row = namedtuple("Row", "id content like_count created_at username comment_count user_liked")
+
+def make_rows(count: int) -> list[Row]:
+    now = datetime.utcnow()
+    return [
+        Row(
+            id=uuid.uuid4(),
+            content="hot take " * 50,
+            like_count=i * 3,
+            created_at=now - timedelta(minutes=i),
+            username=f"SpicyGoose{i}",
+            comment_count=i % 7,
+            user_liked=i % 2 == 0,
+        )
+        for i in range(count)
+    ]
+
+# What the endpoints did before: build Pydantic models, then let FastAPI
+# validate them against response_model again and encode with json.dumps
+async def pydantic_page(rows: list[Row], field) -> bytes:
+    response = TakesListResponse(
+        takes=[
+            TakeResponse(
+                id=row.id,
+                content=row.content,
+                like_count=row.like_count,
+                comment_count=row.comment_count,
+                created_at=row.created_at,
+                username=row.username,
+                user_liked=row.user_liked,
+            )
+            for row in rows
+        ],
+        next_cursor=None,
+    )
+    content = await serialize_response(field=field, response_content=response, is_coroutine=True)
+    return JSONResponse(content).body
+
+async def orjson_page(rows: list[Row], field) -> bytes:
+    return ORJSONResponse({"takes": [take_payload(row) for row in rows], "next_cursor": None}).body
+
+async def measure(encode, rows, field, iterations: int) -> float:
+    for _ in range(min(iterations, 100)):
+        await encode(rows, field)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await encode(rows, field)
+    return (time.perf_counter() - start) / iterations
+
+async def main(args) -> dict:
+    field = create_response_field(name="Response_get_takes", type_=TakesListResponse)
+    results = {}
+    for page_size in args.page_sizes:
+        rows = make_rows(page_size)
+        before = await measure(pydantic_page, rows, field, args.iterations)
+        after = await measure(orjson_page, rows, field, args.iterations)
+        results[f"page_{page_size}"] = {
+            "pydantic_us": round(before * 1e6, 1),
+            "orjson_us": round(after * 1e6, 1),
+            "speedup": round(before / after, 2),
+            "bytes": len(await orjson_page(rows, field)),
+        }
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare feed serialization paths")
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--page-sizes", type=int, nargs="+", default=[20, 100])
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    results = asyncio.run(main(args))
+    print_results(results)
+    print(f"Saved {save_results('serialization', vars(args), results, args.output)}")
@@ -0,0 +1,174 @@
+import argparse
+import asyncio
+import multiprocessing
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+import redis.asyncio as redis
+
+from app.config import get_settings
+from app.utils.redis_client import create_pool
+from benchmarks.common import free_port, print_results, save_results
+
+# WebSocket fan-out throughput as the worker count grows. For each count it
+# starts `python -m app.server --workers N`, opens --subscribers /ws/feed
+# sockets from several client processes (so the clients aren't the limit),
+# publishes --messages events straight to the feed channel and reports
+# deliveries per second. Workers are separate processes, so this needs the
+# Redis from REDIS_URL rather than fakeredis; Postgres isn't used.
+#
+#   python -m benchmarks.workers --workers 1 2 4 --subscribers 4000 --messages 200
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+def start_server(port: int, workers: int, timeout: float) -> subprocess.Popen:
+    process = subprocess.Popen(
+        [sys.executable, "-m", "app.server", "--host", "127.0.0.1", "--port", str(port), "--workers", str(workers)],
+        cwd=BACKEND_DIR, env=os.environ.copy(),
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.perf_counter() + timeout
+    with httpx.Client(timeout=1.0) as client:
+        while time.perf_counter() < deadline:
+            if process.poll() is not None:
+                raise SystemExit(f"Server exited with code {process.returncode}")
+            try:
+                if client.get(f"http://127.0.0.1:{port}/health").status_code == 200:
+                    # Give every worker time to finish startup and subscribe
+                    time.sleep(1.0 + 0.2 * workers)
+                    return process
+            except httpx.TransportError:
+                pass
+            time.sleep(0.05)
+    process.terminate()
+    raise SystemExit(f"/health didn't return 200 within {timeout}s")
+
+# Client process: open `count` sockets, report how many connected, then count
+# bench messages until every socket has all of them or the timeout passes.
+# Reports (delivered, time of the last delivery).
+def run_clients(url: str, count: int, messages: int, timeout: float, ready, results):
+    asyncio.run(_clients(url, count, messages, timeout, ready, results))
+
+async def _clients(url: str, count: int, messages: int, timeout: float, ready, results):
+    import websockets
+
+    connect_limit = asyncio.Semaphore(100)
+    sockets = []
+
+    async def connect():
+        async with connect_limit:
+            try:
+                sockets.append(await websockets.connect(url, max_queue=None))
+            except (OSError, websockets.InvalidHandshake):
+                pass
+
+    await asyncio.gather(*(connect() for _ in range(count)))
+    ready.put(len(sockets))
+
+    expected = len(sockets) * messages
+    delivered = 0
+    last = 0.0
+    done = asyncio.Event()
+
+    async def listen(ws):
+        nonlocal delivered, last
+        try:
+            async for raw in ws:
+                if '"bench"' in raw:
+                    delivered += 1
+                    last = time.time()
+                    if delivered >= expected:
+                        done.set()
+        except websockets.ConnectionClosed:
+            pass
+
+    listeners = [asyncio.create_task(listen(ws)) for ws in sockets]
+    if expected:
+        try:
+            await asyncio.wait_for(done.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+    results.put((delivered, last))
+
+    for listener in listeners:
+        listener.cancel()
+    await asyncio.gather(*(ws.close() for ws in sockets), return_exceptions=True)
+
+async def publish(messages: int) -> float:
+    pool = create_pool(get_settings())
+    client = redis.Redis(connection_pool=pool)
+    try:
+        start = time.time()
+        async with client.pipeline(transaction=False) as pipe:
+            for seq in range(messages):
+                pipe.publish("feed", f'{{"type": "bench", "data": {{"seq": {seq}}}}}')
+            await pipe.execute()
+        return start
+    finally:
+        await pool.disconnect()
+
+def measure(workers: int, args) -> dict:
+    port = free_port()
+    server = start_server(port, workers, args.timeout)
+    context = multiprocessing.get_context("spawn")
+    ready, results = context.Queue(), context.Queue()
+    clients = []
+    try:
+        per_client = [args.subscribers // args.client_processes] * args.client_processes
+        per_client[0] += args.subscribers % args.client_processes
+        for count in per_client:
+            client = context.Process(
+                target=run_clients,
+                args=(f"ws://127.0.0.1:{port}/ws/feed", count, args.messages, args.timeout, ready, results),
+            )
+            client.start()
+            clients.append(client)
+
+        connected = sum(ready.get(timeout=args.timeout) for _ in clients)
+        start = asyncio.run(publish(args.messages))
+        reports = [results.get(timeout=args.timeout + 10) for _ in clients]
+    finally:
+        for client in clients:
+            client.join(timeout=10)
+            if client.is_alive():
+                client.terminate()
+        server.terminate()
+        server.wait()
+
+    delivered = sum(count for count, _ in reports)
+    elapsed = max((last for _, last in reports), default=start) - start
+    return {
+        "subscribers": connected,
+        "expected": connected * args.messages,
+        "delivered": delivered,
+        "seconds": round(elapsed, 3),
+        "deliveries_per_s": round(delivered / elapsed, 1) if elapsed > 0 else 0.0,
+    }
+
+def main(args) -> dict:
+    results = {}
+    baseline = None
+    for workers in args.workers:
+        stats = measure(workers, args)
+        baseline = baseline or stats["deliveries_per_s"]
+        stats["speedup"] = round(stats["deliveries_per_s"] / baseline, 2) if baseline else 0.0
+        results[f"workers_{workers}"] = stats
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure WebSocket fan-out throughput against worker count")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--subscribers", type=int, default=4000)
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--client-processes", type=int, default=max(2, (os.cpu_count() or 2) // 2))
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    results = main(args)
+    print_results(results)
+    print(f"Saved {save_results('workers', vars(args), results, args.output)}")
@@ -99,7 +99,7 @@ export default function TakeDetailPage() {
     }
   };
 
-  // WebSocket: Listen for new comments
+  // WebSocket: Listen for new and removed comments
   useCommentsWebSocket({
     takeId,
     onNewComment: (newComment) => {
@@ -117,6 +117,11 @@ export default function TakeDetailPage() {
         setTake({ ...take, comment_count: take.comment_count + 1 });
       }
     },
+    onDeleteComment: (commentId) => {
+      setComments((prev) => prev.filter((c) => c.id !== commentId));
+      // Functional update: a bulk hide calls this once per comment
+      setTake((prev) => prev && { ...prev, comment_count: Math.max(0, prev.comment_count - 1) });
+    },
   });
 
   // Handle comment submission
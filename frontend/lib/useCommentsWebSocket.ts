@@ -5,10 +5,11 @@ import { config } from "./config";
 interface UseCommentsWebSocketOptions {
   takeId: string;
   onNewComment?: (comment: Comment) => void;
+  onDeleteComment?: (commentId: string) => void;
 }
 
 export function useCommentsWebSocket(options: UseCommentsWebSocketOptions) {
-  const { takeId, onNewComment } = options;
+  const { takeId, onNewComment, onDeleteComment } = options;
 
   // Convert HTTP URL to WebSocket URL
   const wsUrl =
@@ -19,6 +20,10 @@ export function useCommentsWebSocket(options: UseCommentsWebSocketOptions) {
     onMessage: (message) => {
       if (message.type === "new_comment" && onNewComment) {
         onNewComment(message.data);
+      } else if (message.type === "delete_comment" && onDeleteComment) {
+        onDeleteComment(message.data.id);
+      } else if (message.type === "hide_comments" && onDeleteComment) {
+        message.data.ids.forEach((id: string) => onDeleteComment(id));
       }
     },
     onError: (error) => {
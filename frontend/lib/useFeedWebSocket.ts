@@ -22,6 +22,8 @@ export function useFeedWebSocket(options: UseFeedWebSocketOptions) {
         onLikeUpdate(message.data.id, message.data.like_count);
       } else if (message.type === "delete_take" && onDeleteTake) {
         onDeleteTake(message.data.id);
+      } else if (message.type === "hide_takes" && onDeleteTake) {
+        message.data.ids.forEach((id: string) => onDeleteTake(id));
       }
     },
     onError: (error) => {
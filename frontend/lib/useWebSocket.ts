@@ -10,8 +10,12 @@ interface UseWebSocketOptions {
   onError?: (error: Event) => void;
   reconnectInterval?: number;
   maxReconnectAttempts?: number;
+  restartJitter?: number;
 }
 
+// Close code the backend sends while draining connections for a restart
+const SERVICE_RESTART = 1012;
+
 export function useWebSocket(url: string, options: UseWebSocketOptions) {
   const wsRef = useRef<WebSocket | null>(null);
   const reconnectAttemptsRef = useRef(0);
@@ -23,6 +27,7 @@ export function useWebSocket(url: string, options: UseWebSocketOptions) {
     onError,
     reconnectInterval = 1000,
     maxReconnectAttempts = 5,
+    restartJitter = 10000,
   } = options;
 
   const connect = useCallback(() => {
@@ -61,18 +66,29 @@ export function useWebSocket(url: string, options: UseWebSocketOptions) {
         onError?.(error);
       };
 
-      ws.onclose = () => {
+      ws.onclose = (event) => {
         console.log("WebSocket disconnected");
         wsRef.current = null;
 
-        // Attempt to reconnect with exponential backoff
+        // The server is restarting (deploy): reconnect at a random point in
+        // the restart window so clients don't all come back at once
+        if (shouldConnectRef.current && event.code === SERVICE_RESTART) {
+          const delay = Math.random() * restartJitter;
+          console.log(`Server restarting, reconnecting in ${Math.round(delay)}ms...`);
+          reconnectTimeoutRef.current = setTimeout(connect, delay);
+          return;
+        }
+
+        // Attempt to reconnect with jittered exponential backoff
         if (
           shouldConnectRef.current &&
           reconnectAttemptsRef.current < maxReconnectAttempts
         ) {
           const delay =
-            reconnectInterval * Math.pow(2, reconnectAttemptsRef.current);
-          console.log(`Reconnecting in ${delay}ms...`);
+            reconnectInterval *
+            Math.pow(2, reconnectAttemptsRef.current) *
+            (0.5 + Math.random() / 2);
+          console.log(`Reconnecting in ${Math.round(delay)}ms...`);
 
           reconnectTimeoutRef.current = setTimeout(() => {
             reconnectAttemptsRef.current++;
@@ -85,7 +101,7 @@ export function useWebSocket(url: string, options: UseWebSocketOptions) {
     } catch (error) {
       console.error("Failed to create WebSocket:", error);
     }
-  }, [url, onMessage, onError, reconnectInterval, maxReconnectAttempts]);
+  }, [url, onMessage, onError, reconnectInterval, maxReconnectAttempts, restartJitter]);
 
   useEffect(() => {
     shouldConnectRef.current = true;